@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+from collections import deque
+import pygame
+import bundle
+
+CACHE_DIR = ".asset_cache"
+
+
+class AssetManager:
+    def __init__(self):
+        self.images = {}
+        self.scaled = {}
+        self.derived = {}
+        self.missing = set()
+        # ruwe, nog niet geconverteerde surfaces van de achtergrondthread
+        self.decoded = {}
+        self.queue = deque()
+        self.lock = threading.Lock()
+        self.worker = None
+        # geschaalde varianten op schijf, per hash van het bronbestand
+        self.hashes = {}
+        self.variants = None
+
+    def preload(self, paths, first=False):
+        # first=True zet de paden vooraan, bv. wat een sessie nu meteen nodig heeft
+        with self.lock:
+            for path in (reversed(paths) if first else paths):
+                if self.is_ready(path):
+                    continue
+                if path in self.queue:
+                    if not first:
+                        continue
+                    self.queue.remove(path)
+                if first:
+                    self.queue.appendleft(path)
+                else:
+                    self.queue.append(path)
+            if self.queue and self.worker is None:
+                self.worker = threading.Thread(target=self.decode_queue, daemon=True)
+                self.worker.start()
+
+    def decode_queue(self):
+        while True:
+            with self.lock:
+                if not self.queue:
+                    self.worker = None
+                    return
+                path = self.queue.popleft()
+            try:
+                image = bundle.load_image(path)
+            except (pygame.error, FileNotFoundError):
+                image = None
+            with self.lock:
+                if image is None:
+                    self.missing.add(path)
+                else:
+                    self.decoded[path] = image
+
+    def is_ready(self, path):
+        return path in self.decoded or path in self.missing or (path, True) in self.images or (path, False) in self.images
+
+    def progress(self, paths):
+        with self.lock:
+            done = sum(1 for path in paths if self.is_ready(path))
+        return done / len(paths) if paths else 1.0
+
+    def source(self, path, alpha=True):
+        key = (path, alpha)
+        image = self.images.get(key)
+        if image is None:
+            with self.lock:
+                raw = self.decoded.get(path)
+                missing = path in self.missing
+            if missing:
+                raise FileNotFoundError(path)
+            if raw is None:
+                # nog niet door de achtergrondthread gedaan: zelf laden in plaats van wachten
+                try:
+                    raw = bundle.load_image(path)
+                except (pygame.error, FileNotFoundError):
+                    # niet elke frame opnieuw van schijf proberen
+                    with self.lock:
+                        self.missing.add(path)
+                    raise FileNotFoundError(path)
+                with self.lock:
+                    self.decoded[path] = raw
+            image = raw.convert_alpha() if alpha else raw.convert()
+            self.images[key] = image
+        return image
+
+    def image(self, path, size=None, alpha=True):
+        if size is None:
+            return self.source(path, alpha)
+        size = tuple(size)
+        key = (path, size, alpha)
+        image = self.scaled.get(key)
+        if image is None:
+            image = self.scaled[key] = self.load_variant(path, size, alpha)
+        return image
+
+    def source_hash(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self.hashes.get(path)
+        if cached is None or cached[0] != stamp:
+            with open(path, "rb") as f:
+                cached = self.hashes[path] = (stamp, hashlib.sha1(f.read()).hexdigest()[:16])
+        return cached[1]
+
+    def cached_variants(self, digest, alpha):
+        if self.variants is None:
+            self.variants = {}
+            try:
+                names = os.listdir(CACHE_DIR)
+            except OSError:
+                names = []
+            for name in names:
+                parts = name[:-4].split("_") if name.endswith(".raw") else []
+                if len(parts) == 3 and "x" in parts[1]:
+                    w, _, h = parts[1].partition("x")
+                    self.variants.setdefault((parts[0], parts[2] == "a"), set()).add((int(w), int(h)))
+        return self.variants.setdefault((digest, alpha), set())
+
+    def load_variant(self, path, size, alpha):
+        digest = self.source_hash(path)
+        if digest is None:
+            return pygame.transform.scale(self.source(path, alpha), size)
+        fmt = "RGBA" if alpha else "RGB"
+        variants = self.cached_variants(digest, alpha)
+
+        if size in variants:
+            try:
+                with open(self.variant_path(digest, size, alpha), "rb") as f:
+                    raw = pygame.image.frombuffer(bytearray(f.read()), size, fmt)
+                return raw.convert_alpha() if alpha else raw.convert()
+            except (OSError, ValueError):
+                variants.discard(size)
+
+        # de kleinste variant die nog groot genoeg is, anders de volledige bron
+        larger = [v for v in variants if v[0] >= size[0] and v[1] >= size[1]]
+        base = None
+        if larger:
+            nearest = min(larger, key=lambda v: v[0] * v[1])
+            try:
+                with open(self.variant_path(digest, nearest, alpha), "rb") as f:
+                    base = pygame.image.frombuffer(bytearray(f.read()), nearest, fmt)
+            except (OSError, ValueError):
+                variants.discard(nearest)
+        if base is None:
+            base = self.source(path, alpha)
+        image = pygame.transform.scale(base, size)
+        if alpha: image = image.convert_alpha()
+        else: image = image.convert()
+
+        variants.add(size)
+        data = pygame.image.tobytes(image, fmt)
+        threading.Thread(target=self.write_variant, args=(self.variant_path(digest, size, alpha), data), daemon=True).start()
+        return image
+
+    @staticmethod
+    def variant_path(digest, size, alpha):
+        return os.path.join(CACHE_DIR, f"{digest}_{size[0]}x{size[1]}_{'a' if alpha else 'o'}.raw")
+
+    @staticmethod
+    def write_variant(path, data):
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+
+    def get(self, key, build):
+        # voor afgeleide surfaces zoals gespiegelde schepen en rotatie-atlassen
+        value = self.derived.get(key)
+        if value is None:
+            value = self.derived[key] = build()
+        return value
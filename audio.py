@@ -1,32 +1,194 @@
+import threading
 import pygame
+import audio_path
+import bundle
 
 current_music = None
 music_enabled = True
 sfx_enabled = True
 
-def play_music(track, volume, loop=-1):
-    global current_music
+SFX_CHANNELS = 8
+SFX_TRACKS = [audio_path.hit_sound, audio_path.button_sound, audio_path.split_sound, audio_path.heal_sound]
+
+# priority: hoger wint als alle kanalen bezet zijn
+# max_voices: hoeveel keer hetzelfde geluid tegelijk mag spelen
+# min_interval: ms voor hetzelfde geluid opnieuw mag starten
+SFX_LIMITS = {
+    audio_path.hit_sound: {"priority": 3, "max_voices": 2, "min_interval": 80},
+    audio_path.heal_sound: {"priority": 2, "max_voices": 2, "min_interval": 60},
+    audio_path.button_sound: {"priority": 2, "max_voices": 1, "min_interval": 50},
+    audio_path.split_sound: {"priority": 1, "max_voices": 3, "min_interval": 40},
+}
+DEFAULT_LIMIT = {"priority": 1, "max_voices": 2, "min_interval": 0}
+
+sfx_bank = {}
+sfx_lock = threading.Lock()
+# (kanalen, track per kanaal, starttijd per kanaal), pas gezet als alles klaar is
+sfx_pool = None
+last_played = {}
+
+MUSIC_TRACKS = [audio_path.menu_music, audio_path.gameplay_music, audio_path.gameover_music]
+MUSIC_FADE_MS = 800
+# de twee muziekkanalen komen na de effecten zodat get_channel ze nooit kiest
+MUSIC_FIRST_CHANNEL = SFX_CHANNELS
+
+music_bank = {}
+music_loading = set()
+music_lock = threading.RLock()
+music_channels = []
+music_channel = 0
+pending_music = None
+
+def preload_music(tracks=MUSIC_TRACKS):
+    # muziek decoderen gebeurt op een achtergrondthread, de game loop wacht er nooit op
+    # met muziek uit wordt er niets gedecodeerd, toggle_music start het later alsnog
+    if not music_enabled: return
+    for track in tracks:
+        with music_lock:
+            if track in music_bank or track in music_loading:
+                continue
+            music_loading.add(track)
+        threading.Thread(target=load_music, args=(track,), daemon=True).start()
+
+def load_music(track):
+    try:
+        sound = pygame.mixer.Sound(track)
+    except:
+        sound = None
+
+    with music_lock:
+        music_bank[track] = sound
+        music_loading.discard(track)
+        if pending_music is not None and pending_music[0] == track:
+            start_music(*pending_music)
+
+def start_music(track, volume, loop, fade_ms):
+    global pending_music, music_channel
+    pending_music = None
+    if not music_channels:
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), MUSIC_FIRST_CHANNEL + 2))
+        music_channels.extend(pygame.mixer.Channel(MUSIC_FIRST_CHANNEL + i) for i in range(2))
+
+    old = music_channels[music_channel]
+    if old.get_busy():
+        old.fadeout(fade_ms)
+
+    sound = music_bank.get(track)
+    # ontbrekend bestand: de vorige track gewoon uitfaden
+    if sound is None: return
+
+    music_channel = 1 - music_channel
+    channel = music_channels[music_channel]
+    channel.set_volume(volume)
+    channel.play(sound, loops=loop, fade_ms=fade_ms)
+
+def play_music(track, volume, loop=-1, fade_ms=MUSIC_FADE_MS):
+    global current_music, pending_music
     if not music_enabled: return
-    if current_music != track:
-        pygame.mixer.music.stop()
-        pygame.mixer.music.load(track)
-        pygame.mixer.music.set_volume(volume)
-        pygame.mixer.music.play(loop)
-        current_music = track
+    if current_music == track: return
+    current_music = track
+
+    with music_lock:
+        if track in music_bank:
+            start_music(track, volume, loop, fade_ms)
+            return
+        pending_music = (track, volume, loop, fade_ms)
+    preload_music([track])
+
+def music_busy():
+    with music_lock:
+        if pending_music is not None:
+            return True
+    return any(channel.get_busy() for channel in music_channels)
+
+def stop_music():
+    global current_music, pending_music
+    with music_lock:
+        pending_music = None
+        for channel in music_channels:
+            channel.stop()
+    current_music = None
 
 def toggle_music():
-    global music_enabled, current_music
+    global music_enabled
     music_enabled = not music_enabled
-    if not music_enabled:
-        pygame.mixer.music.stop()
-        current_music = None
+    if music_enabled:
+        preload_music()
+    else:
+        stop_music()
     return music_enabled
 
+def preload_sfx(tracks=SFX_TRACKS):
+    threading.Thread(target=init_sfx, args=(tracks,), daemon=True).start()
+
+def init_sfx(tracks=SFX_TRACKS, channels=SFX_CHANNELS):
+    global sfx_pool
+    with sfx_lock:
+        # alles een keer decoderen zodat play_sfx nooit meer van schijf leest
+        for track in tracks:
+            if track not in sfx_bank:
+                try:
+                    sfx_bank[track] = bundle.load_sound(track)
+                except:
+                    sfx_bank[track] = None
+
+        if sfx_pool is None:
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), channels, MUSIC_FIRST_CHANNEL + 2))
+            # in een keer publiceren, play_sfx op de hoofdthread mag nooit een half gevulde pool zien
+            sfx_pool = ([pygame.mixer.Channel(i) for i in range(channels)], [None] * channels, [0] * channels)
+
+def get_channel(pool, track, priority, max_voices):
+    sfx_channels, channel_tracks, channel_started = pool
+    voices = []
+    free = None
+    victim = None
+    for i, channel in enumerate(sfx_channels):
+        if not channel.get_busy():
+            if free is None: free = i
+            continue
+        playing = channel_tracks[i]
+        if playing == track:
+            voices.append(i)
+        victim_key = (SFX_LIMITS.get(playing, DEFAULT_LIMIT)["priority"], channel_started[i])
+        if victim is None or victim_key < victim[0]:
+            victim = (victim_key, i)
+
+    # te veel van hetzelfde geluid: de oudste stem herstarten
+    if len(voices) >= max_voices:
+        return min(voices, key=lambda i: channel_started[i])
+    if free is not None:
+        return free
+    # alles bezet: het oudste geluid met de laagste prioriteit wegduwen, maar nooit een belangrijker geluid
+    if victim is not None and victim[0][0] <= priority:
+        return victim[1]
+    return None
+
 def play_sfx(track, volume):
-    if sfx_enabled:
-        sound = pygame.mixer.Sound(track)
-        sound.set_volume(volume)
-        sound.play()
+    if not sfx_enabled: return
+    pool = sfx_pool
+    sound = sfx_bank.get(track)
+    if pool is None or sound is None:
+        # nog niet gedecodeerd: dit geluid overslaan in plaats van de frame te laten wachten
+        if track not in sfx_bank and sfx_lock.acquire(blocking=False):
+            sfx_lock.release()
+            preload_sfx([track])
+        return
+
+    limit = SFX_LIMITS.get(track, DEFAULT_LIMIT)
+    now = pygame.time.get_ticks()
+    if now - last_played.get(track, -limit["min_interval"]) < limit["min_interval"]:
+        return
+
+    i = get_channel(pool, track, limit["priority"], limit["max_voices"])
+    if i is None: return
+
+    sfx_channels, channel_tracks, channel_started = pool
+    last_played[track] = now
+    channel_tracks[i] = track
+    channel_started[i] = now
+    channel = sfx_channels[i]
+    channel.set_volume(volume)
+    channel.play(sound)
 
 def toggle_sfx():
     global sfx_enabled
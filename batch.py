@@ -0,0 +1,140 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import simulate
+import main
+
+# alleen main.LevelSession heeft een headless step; de moeilijkheden en levels van level_main.py
+# hebben eigen spawnregels en snelheden en worden hier dus niet gemeten
+SESSION = "main.LevelSession"
+
+# deze waarden zijn in pixels per frame op 1024x768 en schalen mee met de hoogte
+SCALED_PARAMS = ("start_speed", "speed_increase", "max_fall_speed")
+TUNABLE_PARAMS = ("block_count", "start_speed", "speed_increase", "max_fall_speed", "splitter_chance", "split_max_extra")
+
+
+def session_params(overrides):
+    params = dict(overrides)
+    for name in SCALED_PARAMS:
+        if name in params:
+            params[name] = params[name] * main.SCALE_H
+    return params
+
+
+def run_job(job):
+    bot, overrides, seed, max_ticks = job
+    result = simulate.run_session(bot, max_ticks, seed=seed, params=session_params(overrides))
+    # alleen terugsturen wat de rapportage nodig heeft, de tijdlijnen zijn te groot om te pickelen
+    phases = [(p["mode"], p["ticks"], p["score"]) for p in result["phases"]]
+    return (bot, overrides), result["result"], result["seconds"], result["score"], phases
+
+
+def distribution(values):
+    values = np.asarray(values, dtype=float)
+    p10, p50, p90 = np.percentile(values, (10, 50, 90))
+    return {"mean": round(float(values.mean()), 1), "p10": round(float(p10), 1),
+            "p50": round(float(p50), 1), "p90": round(float(p90), 1)}
+
+
+def summarize(rows, sim_hz):
+    groups = {}
+    for key, outcome, seconds, score, phases in rows:
+        group = groups.setdefault(key, {"gameovers": 0, "seconds": [], "score": [], "phases": {}})
+        group["gameovers"] += outcome == "GAMEOVER"
+        group["seconds"].append(seconds)
+        group["score"].append(score)
+        # elke portaal-fase telt als een apart level
+        for i, (mode, ticks, phase_score) in enumerate(phases):
+            phase = group["phases"].setdefault(f"{i + 1}-{mode}", {"seconds": [], "score": []})
+            phase["seconds"].append(ticks / sim_hz)
+            phase["score"].append(phase_score)
+
+    report = []
+    for (bot, overrides), group in groups.items():
+        runs = len(group["seconds"])
+        report.append({
+            "session": SESSION,
+            "bot": bot,
+            "params": dict(overrides),
+            "runs": runs,
+            "gameover_rate": round(group["gameovers"] / runs, 3),
+            "survival": distribution(group["seconds"]),
+            "score": distribution(group["score"]),
+            "levels": {
+                name: {"reached": len(phase["seconds"]), "survival": distribution(phase["seconds"]),
+                       "score": distribution(phase["score"])}
+                for name, phase in group["phases"].items()
+            },
+        })
+    return report
+
+
+def parse_grid(assignments):
+    grid = []
+    for assignment in assignments:
+        name, _, values = assignment.partition("=")
+        if name not in TUNABLE_PARAMS or not values:
+            raise argparse.ArgumentTypeError(f"onbekende parameter: {assignment}")
+        cast = int if name in ("block_count", "split_max_extra") else float
+        grid.append([(name, cast(v)) for v in values.split(",")])
+    return [tuple(combo) for combo in itertools.product(*grid)] if grid else [()]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Draai veel headless main.py-sessies parallel om de moeilijkheid af te stellen.")
+    parser.add_argument("--runs", type=int, default=100, help="runs per combinatie")
+    parser.add_argument("--bots", default="dodge", help="komma-gescheiden, keuze uit " + ", ".join(sorted(simulate.BOTS)))
+    parser.add_argument("--set", action="append", default=[], metavar="NAAM=W1,W2",
+                        help="parameter-rooster, bv. splitter_chance=0.05,0.1,0.2 (" + ", ".join(TUNABLE_PARAMS) + ")")
+    parser.add_argument("--max-seconds", type=float, default=300, help="gesimuleerde seconden per run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    bots = args.bots.split(",")
+    for bot in bots:
+        if bot not in simulate.BOTS:
+            parser.error(f"onbekende bot: {bot}")
+    try:
+        grid = parse_grid(args.set)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+
+    sim_hz = main.SIM_HZ
+    max_ticks = int(args.max_seconds * sim_hz)
+    jobs = [(bot, overrides, seed, max_ticks)
+            for bot in bots
+            for overrides in grid
+            for seed in range(args.runs)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        rows = list(pool.map(run_job, jobs, chunksize=max(1, len(jobs) // (args.workers * 8))))
+    wall = time.perf_counter() - start
+
+    report = summarize(rows, sim_hz)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{len(jobs)} runs in {wall:.1f}s op {args.workers} processen")
+    print(f"sessie: {SESSION} met de standaardinstellingen van main.py plus --set; "
+          "de EASY/MEDIUM/HARD levels van level_main.py zijn niet gesimuleerd")
+    for entry in report:
+        params = " ".join(f"{k}={v}" for k, v in entry["params"].items())
+        survival, score = entry["survival"], entry["score"]
+        print(f"{entry['bot']:<6} {params or 'standaard'}")
+        print(f"  overleefd p10/p50/p90 {survival['p10']}/{survival['p50']}/{survival['p90']}s"
+              f"  score p10/p50/p90 {score['p10']}/{score['p50']}/{score['p90']}"
+              f"  game over {entry['gameover_rate']:.0%}")
+        for name, level in entry["levels"].items():
+            print(f"    level {name:<7} bereikt {level['reached']:>5}  overleefd p50 {level['survival']['p50']}s"
+                  f"  score p50 {level['score']['p50']}")
+
+
+if __name__ == "__main__":
+    main_cli()
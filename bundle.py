@@ -0,0 +1,141 @@
+import os
+
+# de build draait zonder venster en zonder geluidskaart
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import json
+import mmap
+import struct
+import threading
+import pygame
+import audio_path
+
+MAGIC = b"SDBN"
+VERSION = 1
+BUNDLE_PATH = "assets.bundle"
+IMAGE_DIR = "images"
+
+
+def source_stamp(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+class Bundle:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:4] != MAGIC:
+            raise ValueError(f"{path} is geen asset bundle")
+        version, index_len = struct.unpack_from("<BI", self.map, 4)
+        if version != VERSION:
+            raise ValueError(f"bundle versie {version} wordt niet ondersteund")
+        start = 4 + struct.calcsize("<BI")
+        self.index = json.loads(self.map[start:start + index_len].decode("utf-8"))
+        self.data_start = start + index_len
+        self.view = memoryview(self.map)
+
+    def entry(self, kind, path):
+        entry = self.index[kind].get(path)
+        if entry is None:
+            return None
+        # bronbestand gewijzigd sinds de build: dan de losse file gebruiken
+        try:
+            if source_stamp(path) != entry["stamp"]:
+                return None
+        except OSError:
+            return None
+        return entry
+
+    def image(self, path):
+        entry = self.entry("images", path)
+        if entry is None:
+            return None
+        offset = self.data_start + entry["offset"]
+        buffer = self.view[offset:offset + entry["length"]]
+        return pygame.image.frombuffer(buffer, entry["size"], entry["format"])
+
+    def sound(self, path):
+        if pygame.mixer.get_init() != tuple(self.index["mixer"]):
+            return None
+        entry = self.entry("sounds", path)
+        if entry is None:
+            return None
+        offset = self.data_start + entry["offset"]
+        return pygame.mixer.Sound(buffer=self.view[offset:offset + entry["length"]])
+
+
+_bundle = None
+_bundle_checked = False
+# de asset-thread en de sfx-thread vragen de bundle tegelijk op bij het opstarten
+_bundle_lock = threading.Lock()
+
+
+def get_bundle():
+    global _bundle, _bundle_checked
+    if not _bundle_checked:
+        with _bundle_lock:
+            if not _bundle_checked:
+                try:
+                    _bundle = Bundle(BUNDLE_PATH)
+                except (OSError, ValueError):
+                    _bundle = None
+                _bundle_checked = True
+    return _bundle
+
+
+def load_image(path):
+    bundle = get_bundle()
+    image = bundle.image(path) if bundle else None
+    return image if image is not None else pygame.image.load(path)
+
+
+def load_sound(path):
+    bundle = get_bundle()
+    sound = bundle.sound(path) if bundle else None
+    return sound if sound is not None else pygame.mixer.Sound(path)
+
+
+def build(path=BUNDLE_PATH):
+    pygame.init()
+    pygame.mixer.init()
+    index = {"images": {}, "sounds": {}, "mixer": list(pygame.mixer.get_init())}
+    chunks = []
+    offset = 0
+
+    for name in sorted(os.listdir(IMAGE_DIR)):
+        if not name.endswith(".png"):
+            continue
+        image_path = f"{IMAGE_DIR}/{name}"
+        image = pygame.image.load(image_path)
+        fmt = "RGBA" if image.get_flags() & pygame.SRCALPHA else "RGB"
+        data = pygame.image.tobytes(image, fmt)
+        index["images"][image_path] = {"offset": offset, "length": len(data), "size": list(image.get_size()),
+                                       "format": fmt, "stamp": source_stamp(image_path)}
+        chunks.append(data)
+        offset += len(data)
+
+    # alleen de effecten, gedecodeerde muziek zou de bundle tientallen MB groter maken
+    for track in [getattr(audio_path, name) for name in sorted(dir(audio_path)) if name.endswith("_sound")]:
+        data = pygame.mixer.Sound(track).get_raw()
+        index["sounds"][track] = {"offset": offset, "length": len(data), "stamp": source_stamp(track)}
+        chunks.append(data)
+        offset += len(data)
+
+    header = json.dumps(index).encode("utf-8")
+    with open(path + ".tmp", "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<BI", VERSION, len(header)))
+        f.write(header)
+        for data in chunks:
+            f.write(data)
+    os.replace(path + ".tmp", path)
+    return index
+
+
+if __name__ == "__main__":
+    index = build()
+    print(f"{BUNDLE_PATH}: {len(index['images'])} afbeeldingen, {len(index['sounds'])} geluiden, "
+          f"{os.path.getsize(BUNDLE_PATH) // 1024} KiB")
@@ -0,0 +1,86 @@
+import json
+import os
+import pygame
+import pygame.freetype
+
+FONT_DIR = "fonts"
+CACHE_PATH = "font_cache.json"
+# ophogen als de betekenis van de entries verandert, oude caches worden dan genegeerd
+CACHE_VERSION = 2
+
+_paths = None
+
+
+def load_cache():
+    global _paths
+    if _paths is None:
+        try:
+            with open(CACHE_PATH, "r") as f:
+                data = json.load(f)
+            _paths = data["fonts"] if data.get("version") == CACHE_VERSION else {}
+        except (OSError, ValueError, KeyError, AttributeError):
+            _paths = {}
+    return _paths
+
+
+def save_cache():
+    try:
+        with open(CACHE_PATH, "w") as f:
+            json.dump({"version": CACHE_VERSION, "fonts": _paths}, f, indent=2)
+    except OSError:
+        pass
+
+
+def bundled_path(face, bold):
+    name = face.lower() + ("-bold" if bold else "")
+    for ext in (".ttf", ".otf"):
+        path = os.path.join(FONT_DIR, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def resolve(face, bold):
+    # geeft (pad, echt_vet) terug; echt_vet is False als het pad de gewone snede is
+    path = bundled_path(face, bold)
+    if path:
+        return path, bold
+    if bold:
+        path = bundled_path(face, False)
+        if path:
+            return path, False
+
+    cache = load_cache()
+    key = f"{face}|{'bold' if bold else 'regular'}"
+    entry = cache.get(key)
+    if entry and os.path.exists(entry["path"]):
+        return entry["path"], entry["bold"]
+
+    # enkel de eerste keer de systeemfonts laten opsommen (fc-list op Linux)
+    path = pygame.font.match_font(face, bold=bold)
+    real_bold = bold
+    if path is None:
+        # het standaardfont van pygame is zelf al vet
+        path = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+    elif bold and path == pygame.font.match_font(face, bold=False):
+        # geen vette snede: match_font geeft dan de gewone terug, vet moet nagemaakt worden
+        real_bold = False
+    cache[key] = {"path": path, "bold": real_bold}
+    save_cache()
+    return path, real_bold
+
+
+def font(face, size, bold=False):
+    path, real_bold = resolve(face, bold)
+    result = pygame.font.Font(path, size)
+    if bold and not real_bold:
+        result.set_bold(True)
+    return result
+
+
+def freetype_font(face, size, bold=False):
+    path, real_bold = resolve(face, bold)
+    result = pygame.freetype.Font(path, size)
+    if bold and not real_bold:
+        result.strong = True
+    return result
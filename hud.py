@@ -0,0 +1,75 @@
+import pygame
+
+
+class GlyphAtlas:
+    def __init__(self, font, color, labels=()):
+        self.digits = [font.render(str(d), True, color) for d in range(10)]
+        self.widths = [glyph.get_width() for glyph in self.digits]
+        self.labels = {label: font.render(label, True, color) for label in labels}
+        self.height = font.get_height()
+        # genoeg plaats voor elk getal dat in de HUD kan staan
+        self.buffer = [0] * 20
+
+    def draw(self, surface, label, value, pos, flags=0):
+        x, y = pos
+        label_surface = self.labels[label]
+        surface.blit(label_surface, (x, y), special_flags=flags)
+        x += label_surface.get_width()
+
+        buffer = self.buffer
+        value = max(0, int(value))
+        n = 0
+        while True:
+            value, digit = divmod(value, 10)
+            buffer[n] = digit
+            n += 1
+            if value == 0:
+                break
+
+        digits = self.digits
+        widths = self.widths
+        for i in range(n - 1, -1, -1):
+            digit = buffer[i]
+            surface.blit(digits[digit], (x, y), special_flags=flags)
+            x += widths[digit]
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
+
+    def width(self, label, value):
+        width = self.labels[label].get_width()
+        value = max(0, int(value))
+        while True:
+            value, digit = divmod(value, 10)
+            width += self.widths[digit]
+            if value == 0:
+                return width
+
+
+class LivesLayer:
+    def __init__(self, heart, spacing, glyphs=None):
+        self.heart = heart
+        self.spacing = spacing
+        self.glyphs = glyphs
+        self.height = heart.get_height() if heart else glyphs.height
+        self.lives = None
+        self.image = None
+
+    def compose(self, lives):
+        if self.heart:
+            width = (lives - 1) * self.spacing + self.heart.get_width() if lives > 0 else 0
+        else:
+            width = self.glyphs.width("Lives: ", lives)
+        image = pygame.Surface((width, self.height), pygame.SRCALPHA)
+        # pixels kopieren in plaats van mengen, anders worden de randen twee keer geblend
+        if self.heart:
+            for i in range(lives):
+                image.blit(self.heart, (i * self.spacing, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        else:
+            self.glyphs.draw(image, "Lives: ", lives, (0, 0), pygame.BLEND_RGBA_MAX)
+        return image
+
+    def draw(self, surface, lives, pos):
+        # alleen opnieuw samenstellen als het aantal levens veranderd is, anders een enkele blit
+        if lives != self.lives:
+            self.image = self.compose(lives)
+            self.lives = lives
+        return surface.blit(self.image, pos)
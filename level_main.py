@@ -5,6 +5,10 @@ import sys
 import math
 import audio
 import audio_path
+import fonts
+import assets
+import hud
+import sprites
 import json
 import os
 from enum import Enum
@@ -35,6 +39,12 @@ START_SPEED = 3
 SPEED_INCREASE = 0.0005
 MAX_SPEED = 12
 
+DIFFICULTY = {
+    "EASY": {"block_count": 5, "start_speed": 3},
+    "MEDIUM": {"block_count": 10, "start_speed": 5},
+    "HARD": {"block_count": 15, "start_speed": 7},
+}
+
 MIN_SCALE = 0.5  
 MAX_SCALE = 1.5
 SCALE_H = 1
@@ -64,6 +74,13 @@ def save_highscore(level, difficulty, score):
         with open("highscores.json", "w") as f:
             json.dump(scores, f)
 
+def meteor_sprite(session, size, scale=1):
+    if size < 40 * scale:
+        return session.game.assets.image("images/neptunus.png", (size, size))
+    if size < 50 * scale:
+        return session.game.assets.image("images/mars.png", (size, size))
+    return session.game.assets.image("images/jupiter.png", (size, size))
+
 class GameState(Enum):
     QUIT = -1
     TITLE = 0
@@ -91,7 +108,7 @@ class Controls:
 class TextFactory:
     @staticmethod
     def create_surface_with_text(text: str, font_size: int, text_rgb):
-        font = pygame.freetype.SysFont("Courier", font_size, bold=True)
+        font = fonts.freetype_font("Courier", font_size, bold=True)
         surface, _ = font.render(text=text, fgcolor=text_rgb, bgcolor=None)
         return surface.convert_alpha()
 
@@ -111,7 +128,7 @@ class UIElement(Sprite):
         self.rect = self.image.get_rect(center=center_position)
 
     def create_button_surface(self, text, font_size, text_rgb, bg_color, size):
-        font = pygame.freetype.SysFont("Courier", font_size, bold=True)
+        font = fonts.freetype_font("Courier", font_size, bold=True)
         if bg_color:
             surface = pygame.Surface(size).convert_alpha()
             surface.fill(bg_color)
@@ -164,26 +181,19 @@ class MenuScreenBase:
 class LevelSelectScreen:
     def __init__(self, game):
         self.game = game
-        self.font = pygame.font.SysFont("Arial", 40, bold=True)
+        self.font = fonts.font("Arial", 40, bold=True)
         self.selected_level = None 
         self.current_difficulty = None
         self.show_highscore_step = False
         try:
-            self.bg = pygame.image.load("images/galaxy.png").convert()
-            self.bg = pygame.transform.scale(self.bg, SCREEN_SIZE)
+            self.bg = self.game.assets.image("images/galaxy.png", SCREEN_SIZE, alpha=False)
         except:
             self.bg = None
 
     def set_difficulty(self, diff):
-        if diff == "EASY":
-            self.game.active_block_count = 5
-            self.game.active_start_speed = 3
-        elif diff == "MEDIUM":
-            self.game.active_block_count = 10
-            self.game.active_start_speed = 5
-        elif diff == "HARD":
-            self.game.active_block_count = 15
-            self.game.active_start_speed = 7
+        if diff in DIFFICULTY:
+            self.game.active_block_count = DIFFICULTY[diff]["block_count"]
+            self.game.active_start_speed = DIFFICULTY[diff]["start_speed"]
 
     def run(self, screen):
         self.selected_level = None 
@@ -298,7 +308,7 @@ class ControlsScreen:
 
     @staticmethod
     def show_taken_error(button: UIElement, screen):
-        font = pygame.freetype.SysFont("Arial", 25, bold=True)
+        font = fonts.freetype_font("Arial", 25, bold=True)
         text_surf, text_rect = font.render("KEY ALREADY TAKEN!", fgcolor=RED, bgcolor=None)
         x = button.rect.right + 20
         y = button.rect.centery - (text_rect.height / 2)
@@ -401,23 +411,19 @@ class LevelSession:
 
     def load_assets(self):
         try:
-            self.player_img = pygame.image.load("images/spaceshipp.png").convert_alpha()
-            self.player_img = pygame.transform.scale(self.player_img, (PLAYER_RADIUS * 2, PLAYER_RADIUS * 2))
-            self.background_image = pygame.image.load("images/galaxy.png").convert()
-            self.background_image = pygame.transform.scale(self.background_image, SCREEN_SIZE)
-            self.meteor_small = pygame.image.load("images/neptunus.png").convert_alpha()
-            self.meteor_medium = pygame.image.load("images/mars.png").convert_alpha()
-            self.meteor_large = pygame.image.load("images/jupiter.png").convert_alpha()
-            self.heart_image = pygame.image.load("images/lives.png").convert_alpha()
-            self.heart_image = pygame.transform.scale(self.heart_image, (30, 30))
+            self.player_img = self.game.assets.image("images/spaceshipp.png", (PLAYER_RADIUS * 2, PLAYER_RADIUS * 2))
+            self.background_image = self.game.assets.image("images/galaxy.png", SCREEN_SIZE, alpha=False)
+            self.meteor_small = self.game.assets.image("images/neptunus.png")
+            self.meteor_medium = self.game.assets.image("images/mars.png")
+            self.meteor_large = self.game.assets.image("images/jupiter.png")
+            self.heart_image = self.game.assets.image("images/lives.png", (30, 30))
         except Exception as e:
             print(f"Error assets L1: {e}")
 
         self.bg_images = []
         for i in range(1, 5):
             try:
-                img = pygame.image.load(f"images/bgob{i}.png").convert()
-                img = pygame.transform.scale(img, SCREEN_SIZE)
+                img = self.game.assets.image(f"images/bgob{i}.png", SCREEN_SIZE, alpha=False)
                 self.bg_images.append(img)
             except:
                 print(f"Kon afbeelding images/bgob{i}.png niet laden")
@@ -457,9 +463,7 @@ class LevelSession:
 
         for block in blocks:
             x_pos, y_pos, size = block[0], block[1], block[2]
-            img = self.meteor_small if size < 40 else (self.meteor_medium if size < 50 else self.meteor_large)
-            scaled = pygame.transform.scale(img, (size, size))
-            surface.blit(scaled, (x_pos, y_pos))
+            surface.blit(meteor_sprite(self, size), (x_pos, y_pos))
         if immunity_timer == 0 or (immunity_timer // 5) % 2 == 0:
             img_rect = self.player_img.get_rect(center=(int(player_x), int(player_y)))
             surface.blit(self.player_img, img_rect)    
@@ -522,22 +526,17 @@ class LevelSession2:
         self.current_bg_index = 0
 
     def load_assets(self):
-        self.player_img = pygame.image.load("images/spaceshipp.png").convert_alpha()
-        self.player_img = pygame.transform.scale(self.player_img, (PLAYER_RADIUS * 2, PLAYER_RADIUS * 2))
-        self.background_image = pygame.image.load("images/galaxy.png").convert()
-        self.background_image = pygame.transform.scale(self.background_image, SCREEN_SIZE)
-        self.meteor_small = pygame.image.load("images/neptunus.png").convert_alpha()
-        self.meteor_medium = pygame.image.load("images/mars.png").convert_alpha()
-        self.meteor_large = pygame.image.load("images/jupiter.png").convert_alpha()
-        self.heart_image = pygame.image.load("images/lives.png").convert_alpha()
-        self.heart_image = pygame.transform.scale(self.heart_image, (30, 30))
-        self.portal_img = pygame.image.load("images/portal.png").convert_alpha()
-        self.portal_img = pygame.transform.scale(self.portal_img, (200, 40))
+        self.player_img = self.game.assets.image("images/spaceshipp.png", (PLAYER_RADIUS * 2, PLAYER_RADIUS * 2))
+        self.background_image = self.game.assets.image("images/galaxy.png", SCREEN_SIZE, alpha=False)
+        self.meteor_small = self.game.assets.image("images/neptunus.png")
+        self.meteor_medium = self.game.assets.image("images/mars.png")
+        self.meteor_large = self.game.assets.image("images/jupiter.png")
+        self.heart_image = self.game.assets.image("images/lives.png", (30, 30))
+        self.portal_img = self.game.assets.image("images/portal.png", (200, 40))
         self.bg_images = []
         for i in range(1, 5):
             try:
-                img = pygame.image.load(f"images/bgob{i}.png").convert()
-                img = pygame.transform.scale(img, SCREEN_SIZE)
+                img = self.game.assets.image(f"images/bgob{i}.png", SCREEN_SIZE, alpha=False)
                 self.bg_images.append(img)
             except:
                 print(f"Kon afbeelding images/bgob{i}.png niet laden")
@@ -600,9 +599,7 @@ class LevelSession2:
         if portal_rect: surface.blit(self.portal_img, (portal_rect.x, portal_rect.y))
         for block in blocks:
             x_pos, y_pos, size = block[0], block[1], block[2]
-            img = self.meteor_small if size < 40 else (self.meteor_medium if size < 50 else self.meteor_large)
-            scaled = pygame.transform.scale(img, (size, size))
-            surface.blit(scaled, (x_pos, y_pos))
+            surface.blit(meteor_sprite(self, size), (x_pos, y_pos))
         if immunity_timer == 0 or (immunity_timer // 5) % 2 == 0:
             rect = self.player_img.get_rect(center=(int(player_x), int(player_y)))
             surface.blit(self.player_img, rect)
@@ -702,23 +699,19 @@ class LevelSession3:
 
     def load_assets(self):
         try:
-            self.player_img = pygame.image.load("images/spaceshipp.png").convert_alpha()
-            self.player_img = pygame.transform.scale(self.player_img, (PLAYER_RADIUS * 2, PLAYER_RADIUS * 2))
-            self.background_image = pygame.image.load("images/galaxy.png").convert()
-            self.background_image = pygame.transform.scale(self.background_image, SCREEN_SIZE)
-            self.meteor_small = pygame.image.load("images/neptunus.png").convert_alpha()
-            self.meteor_medium = pygame.image.load("images/mars.png").convert_alpha()
-            self.meteor_large = pygame.image.load("images/jupiter.png").convert_alpha()
-            self.heart_image = pygame.image.load("images/lives.png").convert_alpha()
-            self.heart_image = pygame.transform.scale(self.heart_image, (30, 30))
+            self.player_img = self.game.assets.image("images/spaceshipp.png", (PLAYER_RADIUS * 2, PLAYER_RADIUS * 2))
+            self.background_image = self.game.assets.image("images/galaxy.png", SCREEN_SIZE, alpha=False)
+            self.meteor_small = self.game.assets.image("images/neptunus.png")
+            self.meteor_medium = self.game.assets.image("images/mars.png")
+            self.meteor_large = self.game.assets.image("images/jupiter.png")
+            self.heart_image = self.game.assets.image("images/lives.png", (30, 30))
         except Exception as e:
             print(f"Error assets L1: {e}")
 
         self.bg_images = []
         for i in range(1, 5):
             try:
-                img = pygame.image.load(f"images/bgob{i}.png").convert()
-                img = pygame.transform.scale(img, SCREEN_SIZE)
+                img = self.game.assets.image(f"images/bgob{i}.png", SCREEN_SIZE, alpha=False)
                 self.bg_images.append(img)
             except:
                 print(f"Kon afbeelding images/bgob{i}.png niet laden")
@@ -777,9 +770,7 @@ class LevelSession3:
 
         for block in blocks:
             x_pos, y_pos, size = block[0], block[1], block[2]
-            img = self.meteor_small if size < 40 else (self.meteor_medium if size < 50 else self.meteor_large)
-            scaled = pygame.transform.scale(img, (size, size))
-            surface.blit(scaled, (x_pos, y_pos))
+            surface.blit(meteor_sprite(self, size), (x_pos, y_pos))
         if immunity_timer == 0 or (immunity_timer // 5) % 2 == 0:
             img_rect = self.player_img.get_rect(center=(int(player_x), int(player_y)))
             surface.blit(self.player_img, img_rect)    
@@ -840,6 +831,8 @@ class LevelSession4(LevelSession):
         self.meteor_medium = None
         self.meteor_large = None
         self.heart_image = None
+        self.lives_layer = None
+        self.splitter_rings = sprites.RingCache(YELLOW, 3)
         self.portal_image = None
         self.last_rendered_score = -1
         self.score_surface = None
@@ -888,16 +881,14 @@ class LevelSession4(LevelSession):
 
         self.player_radius = int((final_pixel_size // 2) * data["hitbox"])
         try:
-            self.player_image = pygame.image.load(f"images/{self.game.current_skin}").convert_alpha()
-            self.player_image = pygame.transform.scale(self.player_image, (final_pixel_size, final_pixel_size))
+            self.player_image = self.game.assets.image(f"images/{self.game.current_skin}", (final_pixel_size, final_pixel_size))
         except:
             self.player_image = None
 
         self.bg_images = []
         for i in range(1, 5):
             try:
-                img = pygame.image.load(f"images/bgob{i}.png").convert()
-                img = pygame.transform.scale(img, SCREEN_SIZE)
+                img = self.game.assets.image(f"images/bgob{i}.png", SCREEN_SIZE, alpha=False)
                 self.bg_images.append(img)
             except:
                 pass
@@ -905,15 +896,14 @@ class LevelSession4(LevelSession):
         self.current_bg_index = 0
 
         try:
-            self.background_image = pygame.image.load("images/galaxy.png").convert()
-            self.background_image = pygame.transform.scale(self.background_image, SCREEN_SIZE)
+            self.background_image = self.game.assets.image("images/galaxy.png", SCREEN_SIZE, alpha=False)
         except:
             self.background_image = None
 
         try:
-            self.meteor_small = pygame.image.load("images/neptunus.png").convert_alpha()
-            self.meteor_medium = pygame.image.load("images/mars.png").convert_alpha()
-            self.meteor_large = pygame.image.load("images/jupiter.png").convert_alpha()
+            self.meteor_small = self.game.assets.image("images/neptunus.png")
+            self.meteor_medium = self.game.assets.image("images/mars.png")
+            self.meteor_large = self.game.assets.image("images/jupiter.png")
         except:
             self.meteor_small = None
             self.meteor_medium = None
@@ -921,16 +911,15 @@ class LevelSession4(LevelSession):
 
         try:
             heart_size = int(30 * MIN_SCALE)
-            self.heart_image = pygame.image.load("images/lives.png").convert_alpha()
-            self.heart_image = pygame.transform.scale(self.heart_image, (heart_size, heart_size))
+            self.heart_image = self.game.assets.image("images/lives.png", (heart_size, heart_size))
         except:
             self.heart_image = None
+        self.lives_layer = hud.LivesLayer(self.heart_image, 35) if self.heart_image else None
 
         try:
-            self.portal_image = pygame.image.load("images/portal.png").convert_alpha()
             portal_w = max(1, int(200 * MIN_SCALE))
             portal_h = max(1, int(40 * MIN_SCALE))
-            self.portal_image = pygame.transform.scale(self.portal_image, (portal_w, portal_h))
+            self.portal_image = self.game.assets.image("images/portal.png", (portal_w, portal_h))
         except:
             self.portal_image = None
 
@@ -961,18 +950,7 @@ class LevelSession4(LevelSession):
         
         block_img = None
         if self.meteor_small and self.meteor_medium and self.meteor_large:
-            boundary_small = 40 * MIN_SCALE
-            boundary_medium = 50 * MIN_SCALE
-            
-            if size < boundary_small:
-                base_img = self.meteor_small
-            elif size < boundary_medium:
-                base_img = self.meteor_medium
-            else:
-                base_img = self.meteor_large
-            
-            
-            block_img = pygame.transform.scale(base_img, (size, size))
+            block_img = meteor_sprite(self, size, MIN_SCALE)
         
         return {
             "x": float(x),
@@ -1093,12 +1071,7 @@ class LevelSession4(LevelSession):
             by = int(b["y"])
             if b.get("image") is None:
                 if self.meteor_small and self.meteor_medium and self.meteor_large:
-                    boundary_small = 40 * MIN_SCALE
-                    boundary_medium = 50 * MIN_SCALE
-                    if b["size"] < boundary_small: base_img = self.meteor_small
-                    elif b["size"] < boundary_medium: base_img = self.meteor_medium
-                    else: base_img = self.meteor_large
-                    b["image"] = pygame.transform.scale(base_img, (b["size"], b["size"]))
+                    b["image"] = meteor_sprite(self, b["size"], MIN_SCALE)
                 else: b["image"] = None
 
             if b.get("image"):
@@ -1108,7 +1081,7 @@ class LevelSession4(LevelSession):
 
             if b["splitter"] and not b["split_done"]:
                 radius = int((b["size"] // 2) + (8 * MIN_SCALE))
-                pygame.draw.circle(canvas, YELLOW, (int(b["x"] + b["size"] // 2), int(b["y"] + b["size"] // 2)), max(1, radius), 3)
+                self.splitter_rings.draw(canvas, (int(b["x"] + b["size"] // 2), int(b["y"] + b["size"] // 2)), max(1, radius))
 
         if immunity <= 0 or (int(immunity) // 5) % 2 == 0:
             if self.player_image:
@@ -1141,9 +1114,8 @@ class LevelSession4(LevelSession):
         
         
 
-        if self.heart_image:
-            for i in range(lives):
-                surface.blit(self.heart_image, (20 + (i * 35), 20))
+        if self.lives_layer:
+            self.lives_layer.draw(surface, lives, (20, 20))
 
         pygame.display.flip()
 
@@ -1181,30 +1153,6 @@ class LevelSession4(LevelSession):
                     if event.key == pygame.K_ESCAPE:
                         return GameState.TITLE
 
-                if event.type == pygame.VIDEORESIZE:
-                    old_w, old_h = SCREEN_WIDTH, SCREEN_HEIGHT
-                    rx = x / old_w if old_w else 0.5
-                    ry = y / old_h if old_h else 0.5
-
-                    self.game.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
-                    screen = self.game.screen
-                    recalc_display_metrics(screen)
-                    self.game._load_menu_background()
-                    self.apply_scaling()
-                    self.load_assets()
-                    self.bg_scroll = 0
-                    self.current_bg_index = 0
-
-                    x = rx * SCREEN_WIDTH
-                    y = ry * SCREEN_HEIGHT
-
-                    for block in blocks:
-                        block["image"] = None
-
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
-                            return GameState.TITLE
-
             portal1 = ((score // 10) >= 250 and not level_flipped)
             portal2 = ((score // 10) >= 500 and level_flipped and not level_side)
             portal_active = portal1 or portal2
@@ -1326,8 +1274,11 @@ class Game:
     def __init__(self):
         pygame.init()
         pygame.mixer.init()
+        audio.preload_sfx()
+        audio.preload_music()
+        self.assets = assets.AssetManager()
         global FONT_SCORE
-        FONT_SCORE = pygame.font.SysFont("Arial", 30, bold=True)
+        FONT_SCORE = fonts.font("Arial", 30, bold=True)
         self.controls = Controls()
         self.last_score = 0
         self.current_playing_level = GameState.PLAYING_LVL1
@@ -1335,8 +1286,11 @@ class Game:
         self.active_start_speed = START_SPEED
         self.active_speed_increase = SPEED_INCREASE
         self.active_max_blocks = MAX_BLOCKS
-        self.screen = pygame.display.set_mode(SCREEN_SIZE, pygame.FULLSCREEN | pygame.DOUBLEBUF | pygame.HWSURFACE)
+        self.screen = pygame.display.set_mode(SCREEN_SIZE, pygame.SCALED | pygame.FULLSCREEN)
         pygame.display.set_caption("Dodge Blocks")
+        self.assets.preload(["images/background.png", "images/galaxy.png", "images/spaceshipp.png", "images/neptunus.png",
+                             "images/mars.png", "images/jupiter.png", "images/lives.png", "images/portal.png"]
+                            + [f"images/bgob{i}.png" for i in range(1, 5)])
         self._load_menu_background()
         self.title_screen = TitleScreen(self)
         self.options_screen = OptionsScreen(self)
@@ -1349,8 +1303,7 @@ class Game:
 
     def _load_menu_background(self):
         try:
-            self.menu_background = pygame.image.load("images/background.png").convert()
-            self.menu_background = pygame.transform.scale(self.menu_background, SCREEN_SIZE)
+            self.menu_background = self.assets.image("images/background.png", SCREEN_SIZE, alpha=False)
         except:
             self.menu_background = None
 
@@ -2,9 +2,17 @@ import pygame
 import pygame.freetype
 import random
 import sys
+import functools
 import math
+import numpy as np
 import audio
 import audio_path
+import fonts
+import sprites
+import hud
+import assets
+import replay
+import os
 from enum import Enum
 from pygame.sprite import Sprite, RenderUpdates
 
@@ -23,18 +31,8 @@ SCALE_W = 1
 SCALE_H = 1
 MIN_SCALE = 1
 
-def recalc_display_metrics(screen):
-    global SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_SIZE, CENTER_X, CENTER_Y
-    global SCALE_W, SCALE_H, MIN_SCALE, FONT_SCORE
-    SCREEN_WIDTH, SCREEN_HEIGHT = screen.get_size()
-    SCREEN_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)
-    CENTER_X = SCREEN_WIDTH / 2
-    CENTER_Y = SCREEN_HEIGHT / 2
-    SCALE_W = SCREEN_WIDTH / REF_WIDTH
-    SCALE_H = SCREEN_HEIGHT / REF_HEIGHT
-    MIN_SCALE = min(SCALE_W, SCALE_H)
-
-    FONT_SCORE = pygame.font.SysFont("Arial", max(1, int(30 * MIN_SCALE)), bold = True)
+# vaste simulatiestap, los van de framerate
+SIM_HZ = 120
 
 BLUE = (106, 159, 181)
 WHITE = (255, 255, 255)
@@ -52,7 +50,12 @@ class PowerUpType(Enum):
     BONUS = 3
 
 class PowerUp:
+    __slots__ = ("type", "x", "y", "size", "image", "collected")
+
     def __init__(self, pu_type, x, y, size, image):
+        self.reset(pu_type, x, y, size, image)
+
+    def reset(self, pu_type, x, y, size, image):
         self.type = pu_type
         self.x = x
         self.y = y
@@ -70,6 +73,85 @@ class PowerUp:
             color = GREEN if self.type == PowerUpType.SHIELD else YELLOW
             pygame.draw.circle(surface, color, (int(self.x + self.size/2), int(self.y + self.size/2)), self.size//2)
 
+class PowerUpPool:
+    def __init__(self, capacity=8):
+        self.free = [PowerUp(PowerUpType.SHIELD, 0, 0, 0, None) for _ in range(capacity)]
+
+    def acquire(self, pu_type, x, y, size, image=None):
+        if self.free:
+            pu = self.free.pop()
+            pu.reset(pu_type, x, y, size, image)
+            return pu
+        return PowerUp(pu_type, x, y, size, image)
+
+    def release(self, pu):
+        pu.image = None
+        self.free.append(pu)
+
+
+BLOCK_SPLITTER = 1
+BLOCK_SPLIT_DONE = 2
+BLOCK_TRACKER = 4
+BLOCK_ZIGZAG = 8
+
+class BlockStore:
+    def __init__(self, capacity=32):
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        self.zigzag_offset = np.zeros(capacity, dtype=np.int32)
+        self.images = [None] * capacity
+
+    def __len__(self):
+        return self.count
+
+    def reset(self):
+        self.count = 0
+
+    def reserve(self, needed):
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in ("x", "y", "prev_x", "prev_y", "vx", "vy", "size", "flags", "zigzag_offset"):
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.images.extend([None] * (new_capacity - capacity))
+
+    def append(self, amount):
+        start = self.count
+        self.reserve(start + amount)
+        self.count += amount
+        return np.arange(start, start + amount)
+
+    def first_hit(self, px, py, radius, shrink):
+        n = self.count
+        if n == 0:
+            return -1
+        y, size = self.y[:n], self.size[:n]
+        # broadphase: alleen planeten in de horizontale band rond de speler, zo vallen ook
+        # de planeten weg die spawn_blocks tot 500px buiten beeld klaarzet
+        band = np.flatnonzero((y + size >= py - radius) & (y <= py + radius))
+        if len(band) == 0:
+            return -1
+        planet_radius = size[band] * 0.5
+        dx = px - (self.x[band] + planet_radius)
+        dy = py - (y[band] + planet_radius)
+        # hitbox van de planeet is iets kleiner dan de afbeelding
+        reach = radius + planet_radius - shrink
+        hits = np.flatnonzero((reach > 0) & (dx * dx + dy * dy < reach * reach))
+        if len(hits) == 0:
+            return -1
+        return int(band[hits[0]])
+
 
 class GameState(Enum):
     QUIT = -1
@@ -92,12 +174,27 @@ class Controls:
         return new_key in [self.left, self.right, self.up, self.down]
 
 class TextFactory:
+    font_cache = {}
+
+    @staticmethod
+    def get_font(face: str, size: int, bold: bool = True):
+        key = (face, size, bold)
+        font = TextFactory.font_cache.get(key)
+        if font is None:
+            font = TextFactory.font_cache[key] = fonts.freetype_font(face, size, bold=bold)
+        return font
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def render_text(text: str, size: int, text_rgb):
+        # de surfaces worden gedeeld, dus alleen blitten en nooit aanpassen
+        surface, _ = TextFactory.get_font("Courier", size).render(text=text, fgcolor=text_rgb, bgcolor=None)
+        return surface.convert_alpha()
+
     @staticmethod
     def create_surface_with_text(text: str, font_size: int, text_rgb):
         scaled_size = max(1, int(font_size * MIN_SCALE))
-        font = pygame.freetype.SysFont("Courier", scaled_size, bold=True)
-        surface, _ = font.render(text=text, fgcolor=text_rgb, bgcolor=None)
-        return surface.convert_alpha()
+        return TextFactory.render_text(text, scaled_size, tuple(text_rgb))
 
 class UIElement(Sprite):
     def __init__(self, ratio_position, text, font_size, text_rgb, action=None):
@@ -165,6 +262,40 @@ class UIElement(Sprite):
     def draw(self, surface):
         surface.blit(self.image, self.rect)
 
+class MenuScheduler:
+    def __init__(self, fps=60, idle_timeout=250):
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        # ook zonder events af en toe wakker worden, bv. om de menumuziek te herstarten
+        self.idle_timeout = idle_timeout
+        self.state = None
+
+    def start(self):
+        self.state = None
+
+    def wait(self, timeout=None):
+        if self.state is None:
+            return pygame.event.get()
+        # niets te tekenen: slapen tot er iets gebeurt in plaats van de CPU op te branden
+        event = pygame.event.wait(self.idle_timeout if timeout is None else timeout)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events += pygame.event.get()
+        for event in events:
+            if event.type in (pygame.VIDEORESIZE, pygame.WINDOWEXPOSED):
+                self.state = None
+        return events
+
+    def changed(self, buttons, *extra):
+        state = tuple((button.mouse_over, button.text, button.text_rgb) for button in buttons) + extra
+        if state == self.state:
+            return False
+        self.state = state
+        return True
+
+    def present(self):
+        pygame.display.flip()
+        self.clock.tick(self.fps)
+
 class MenuScreenBase:
     def __init__(self, game):
         self.game = game
@@ -173,7 +304,6 @@ class MenuScreenBase:
         raise NotImplementedError
 
     def run(self, screen) -> GameState:
-        self.game._load_menu_background()
         return self.game.game_loop(screen, self.build_buttons())
     
 class TitleScreen(MenuScreenBase):
@@ -211,14 +341,16 @@ class ControlsScreen:
     @staticmethod
     def wait_for_key():
         while True:
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    return event.key
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                return None
+            if event.type == pygame.KEYDOWN:
+                return event.key
 
     @staticmethod
     def show_taken_error(button: UIElement, screen):
         font_size = max(1, int(25 * MIN_SCALE))
-        font = pygame.freetype.SysFont("Arial", font_size, bold=True)
+        font = TextFactory.get_font("Arial", font_size)
         text_surf, text_rect = font.render("KEY ALREADY TAKEN!", fgcolor=RED, bgcolor=None)
         x = button.rect.right + int(20 * MIN_SCALE)
         y = int(button.rect.centery - (text_rect.height / 2))
@@ -227,7 +359,6 @@ class ControlsScreen:
         pygame.time.delay(1000)
 
     def run(self, screen) -> GameState:
-        self.game._load_menu_background()
         c = self.game.controls
         title = UIElement((0.5, 0.2), "CLICK TO CHANGE KEYS", 50, WHITE)
         btn_left = UIElement((0.5, 0.35), f"move left: {pygame.key.name(c.left).upper()}", 25, WHITE, "CHANGE_LEFT")
@@ -236,24 +367,17 @@ class ControlsScreen:
         btn_up = UIElement((0.5, 0.65), f"move up: {pygame.key.name(c.up).upper()}", 25, WHITE, "CHANGE_UP")
         back_btn = UIElement((0.5, 0.8), "Back to Options", 30, WHITE, GameState.OPTIONS)
         buttons = RenderUpdates(title, btn_left, btn_right, btn_down, btn_up, back_btn)
+        scheduler = self.game.menu_scheduler
+        scheduler.start()
 
         while True:
             mouse_up = False
-            for event in pygame.event.get():
+            for event in scheduler.wait():
                 if event.type == pygame.QUIT:
                     return GameState.QUIT
-                if event.type == pygame.VIDEORESIZE:
-                    self.game.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
-                    screen = self.game.screen
-                    recalc_display_metrics(screen)
-                    self.game._load_menu_background()
-                    for button in buttons:
-                        button.refresh_scaling()
                 if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
                     mouse_up = True
 
-            self.game.draw_menu_background(screen)
-
             for button in buttons:
                 ui_action = button.update(pygame.mouse.get_pos(), mouse_up)
 
@@ -262,6 +386,7 @@ class ControlsScreen:
                         return ui_action
 
                     button.set_text("PRESS KEY...", 25, YELLOW)
+                    self.game.draw_menu_background(screen)
                     buttons.draw(screen)
                     pygame.display.flip()
 
@@ -285,10 +410,13 @@ class ControlsScreen:
                     btn_right.set_text(f"move right: {pygame.key.name(c.right).upper()}", 25, WHITE)
                     btn_down.set_text(f"move down: {pygame.key.name(c.down).upper()}", 25, WHITE)
                     btn_up.set_text(f"move up: {pygame.key.name(c.up).upper()}", 25, WHITE)
+                    # het scherm is buiten de scheduler om getekend, volgende frame alles opnieuw
+                    scheduler.start()
 
-                button.draw(screen)
-
-            pygame.display.flip()
+            if scheduler.changed(buttons):
+                self.game.draw_menu_background(screen)
+                buttons.draw(screen)
+                scheduler.present()
 
 class SoundScreen:
     def __init__(self, game):
@@ -315,25 +443,18 @@ class SoundScreen:
         effects_btn = UIElement((0.5, 0.6), effects_text, 30, effects_col, "TOGGLE_SFX")
         back_btn = UIElement((0.5, 0.8), "Back to Options", 30, WHITE, GameState.OPTIONS)
         buttons = RenderUpdates(title, music_btn, effects_btn, back_btn)
+        scheduler = self.game.menu_scheduler
+        scheduler.start()
 
         while True:
             mouse_up = False
-            for event in pygame.event.get():
+            for event in scheduler.wait():
                 if event.type == pygame.QUIT:
                     return GameState.QUIT
-                
-                if event.type == pygame.VIDEORESIZE:
-                    self.game.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
-                    recalc_display_metrics(self.game.screen)
-                    self.game._load_menu_background()
-                    for button in buttons:
-                        button.refresh_scaling()
 
                 if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
                     mouse_up = True
 
-            self.game.draw_menu_background(screen)
-
             for button in buttons:
                 ui_action = button.update(pygame.mouse.get_pos(), mouse_up)
 
@@ -354,42 +475,124 @@ class SoundScreen:
                 elif isinstance(ui_action, GameState):
                     return ui_action
 
-                button.draw(screen)
+            if scheduler.changed(buttons):
+                self.game.draw_menu_background(screen)
+                buttons.draw(screen)
+                scheduler.present()
+
+SKINS = ["spaceshipp.png", "spaceship.png", "spaceship3.png"]
+
+def gameplay_image_paths(skin, parallax=True):
+    paths = [f"images/{skin}", "images/galaxy.png", "images/neptunus.png", "images/mars.png", "images/jupiter.png",
+             "images/lives.png", "images/portal.png", "images/shield.png", "images/bonus.png"]
+    if parallax:
+        paths += [f"images/bgob{i}.png" for i in range(1, 5)] + ["images/stars.png"]
+    return paths
+
+class LoadingScreen:
+    def __init__(self, game):
+        self.game = game
+
+    def run(self, screen, paths) -> GameState:
+        assets = self.game.assets
+        # alleen wachten op wat deze sessie nog mist, de rest laadt verder op de achtergrond
+        assets.preload(paths, first=True)
+        if assets.progress(paths) >= 1.0:
+            return GameState.PLAYING
+
+        title = UIElement((0.5, 0.4), "LOADING", 50, WHITE)
+        scheduler = self.game.menu_scheduler
+        scheduler.start()
+        while True:
+            # de voortgang verandert zonder events, dus kort wachten
+            for event in scheduler.wait(timeout=33):
+                if event.type == pygame.QUIT:
+                    return GameState.QUIT
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    return GameState.TITLE
+
+            progress = assets.progress(paths)
+            if progress >= 1.0:
+                return GameState.PLAYING
+            if not scheduler.changed([title], progress):
+                continue
 
-            pygame.display.flip()
+            self.game.draw_menu_background(screen)
+            title.draw(screen)
+            bar = pygame.Rect(0, 0, int(400 * MIN_SCALE), max(1, int(24 * MIN_SCALE)))
+            bar.center = (int(SCREEN_WIDTH * 0.5), int(SCREEN_HEIGHT * 0.55))
+            fill = bar.copy()
+            fill.width = int(bar.width * progress)
+            pygame.draw.rect(screen, YELLOW, fill)
+            pygame.draw.rect(screen, WHITE, bar, 2)
+            scheduler.present()
 
 class VideoScreen:
     def __init__(self, game):
         self.game = game
-        self.available_skins = ["spaceshipp.png", "spaceship.png", "spaceship3.png"]
+        self.available_skins = SKINS
         self.skin_index = self.available_skins.index(self.game.current_skin) if self.game.current_skin in self.available_skins else 0
 
     def get_skin_text(self):
         name = self.available_skins[self.skin_index].split(".")[0].capitalize()
         return f"Skin: {name}"
 
+    def get_parallax_info(self):
+        if self.game.parallax_enabled:
+            return "Parallax: ON", GREEN
+        return "Parallax: OFF", RED
+
+    def get_render_info(self):
+        if self.game.dirty_rendering:
+            return "Render: DIRTY RECTS", GREEN
+        return "Render: FULL", WHITE
+
     def run(self, screen) -> GameState:
-        title = UIElement((0.5, 0.2), "VIDEO", 50, WHITE)
-        skin_btn = UIElement((0.5, 0.4), self.get_skin_text(), 35, YELLOW, "CHANGE_SKIN")
-        back_btn = UIElement((0.5, 0.8), "Back to Options", 30, WHITE, GameState.OPTIONS)
-        buttons = RenderUpdates(title, skin_btn, back_btn)
+        parallax_text, parallax_col = self.get_parallax_info()
+        render_text, render_col = self.get_render_info()
+
+        title = UIElement((0.5, 0.12), "VIDEO", 50, WHITE)
+        skin_btn = UIElement((0.5, 0.25), self.get_skin_text(), 35, YELLOW, "CHANGE_SKIN")
+        parallax_btn = UIElement((0.5, 0.66), parallax_text, 30, parallax_col, "TOGGLE_PARALLAX")
+        render_btn = UIElement((0.5, 0.74), render_text, 30, render_col, "TOGGLE_RENDER")
+        back_btn = UIElement((0.5, 0.86), "Back to Options", 30, WHITE, GameState.OPTIONS)
+        buttons = RenderUpdates(title, skin_btn, parallax_btn, render_btn, back_btn)
+        scheduler = self.game.menu_scheduler
+        scheduler.start()
 
         while True:
             mouse_up = False
-            for event in pygame.event.get():
+            for event in scheduler.wait():
                 if event.type == pygame.QUIT:
                     return GameState.QUIT
-                
-                if event.type == pygame.VIDEORESIZE:
-                    self.game.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
-                    recalc_display_metrics(self.game.screen)
-                    self.game._load_menu_background()
-                    for button in buttons:
-                        button.refresh_scaling()
 
                 if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
                     mouse_up = True
 
+            for button in buttons:
+                ui_action = button.update(pygame.mouse.get_pos(), mouse_up)
+
+                if ui_action == "CHANGE_SKIN":
+                    self.skin_index = (self.skin_index + 1) % len(self.available_skins)
+                    self.game.current_skin = self.available_skins[self.skin_index]
+                    button.set_text(self.get_skin_text(), 35, YELLOW)
+
+                elif ui_action == "TOGGLE_PARALLAX":
+                    self.game.parallax_enabled = not self.game.parallax_enabled
+                    new_parallax_text, new_parallax_col = self.get_parallax_info()
+                    button.set_text(new_parallax_text, 30, new_parallax_col)
+
+                elif ui_action == "TOGGLE_RENDER":
+                    self.game.dirty_rendering = not self.game.dirty_rendering
+                    new_render_text, new_render_col = self.get_render_info()
+                    button.set_text(new_render_text, 30, new_render_col)
+
+                elif isinstance(ui_action, GameState):
+                    return ui_action
+
+            if not scheduler.changed(buttons):
+                continue
+
             self.game.draw_menu_background(screen)
 
             try:
@@ -403,41 +606,40 @@ class VideoScreen:
                 preview_size = int(preview_base_size * multiplier * MIN_SCALE)
 
                 preview_path = f"images/{self.game.current_skin}"
-                preview_img = pygame.image.load(preview_path).convert_alpha()
-                preview_img = pygame.transform.scale(preview_img, (preview_size, preview_size))
+                preview_img = self.game.assets.image(preview_path, (preview_size, preview_size))
                 
-                preview_rect = preview_img.get_rect(center=(int(SCREEN_WIDTH * 0.5), int(SCREEN_HEIGHT * 0.55)))
+                preview_rect = preview_img.get_rect(center=(int(SCREEN_WIDTH * 0.5), int(SCREEN_HEIGHT * 0.45)))
                 screen.blit(preview_img, preview_rect)
             except:
-                pygame.draw.circle(screen, YELLOW, (int(SCREEN_WIDTH * 0.5), int(SCREEN_HEIGHT * 0.55)), int(40 * MIN_SCALE))
-            for button in buttons:
-                ui_action = button.update(pygame.mouse.get_pos(), mouse_up)
-
-                if ui_action == "CHANGE_SKIN":
-                    self.skin_index = (self.skin_index + 1) % len(self.available_skins)
-                    self.game.current_skin = self.available_skins[self.skin_index]
-                    button.set_text(self.get_skin_text(), 35, YELLOW)
-
-                elif isinstance(ui_action, GameState):
-                    return ui_action
-
-                button.draw(screen)
-
-            pygame.display.flip()
+                pygame.draw.circle(screen, YELLOW, (int(SCREEN_WIDTH * 0.5), int(SCREEN_HEIGHT * 0.45)), int(40 * MIN_SCALE))
+            buttons.draw(screen)
+            scheduler.present()
 
 class LevelSession:
-    def __init__(self, game):
+    def __init__(self, game, seed=None):
         self.game = game
+        # elke sessie heeft een eigen seed zodat een run exact opnieuw afgespeeld kan worden
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.random = random.Random(self.seed)
+        self.replay = None
         self.player_image = None
         self.player_image_flipped = None
+        self.player_atlas = None
+        self.player_atlas_flipped = None
+        self.tilt_step = 1.0
         self.background_image = None
         self.meteor_small = None
         self.meteor_medium = None
         self.meteor_large = None
         self.heart_image = None
         self.portal_image = None
-        self.last_rendered_score = -1
-        self.score_surface = None
+        self.score_glyphs = None
+        self.lives_glyphs = None
+        self.lives_layer = None
+        self.lives_pos = (0, 0)
+        self.tracker_rings = sprites.RingCache((255, 50, 50), 2)
+        self.splitter_rings = sprites.RingCache(YELLOW, 3)
+        self.shield_rings = sprites.RingCache((0, 200, 255), 3)
 
         self.bg_scroll = 0
         self.bg_scroll2 = 0
@@ -463,6 +665,7 @@ class LevelSession:
         self.shake_intensity = 0
 
         self.powerups = []
+        self.powerup_pool = PowerUpPool()
         self.powerup_spawn_chance = 0.004
         self.shield_active = False
         self.shield_timer = 0
@@ -470,6 +673,14 @@ class LevelSession:
         self.pu_life_img = None
         self.bonus_collected = 0
         self.canvas = pygame.Surface(SCREEN_SIZE)
+        self.dirty_ready = False
+        self.dirty_rects = []
+        self.sim_hz = SIM_HZ
+        self.render_fps = 60
+        self.sim_time = 0.0
+        self.rng = np.random.default_rng(self.seed)
+        # ruimte voor de extra planeten en splitsingen zodat de arrays tijdens een run niet moeten groeien
+        self.blocks = BlockStore(self.block_count + self.split_max_extra + 32)
 
     def apply_scaling(self):
         self.player_radius = max(1, int(20 * MIN_SCALE))
@@ -494,622 +705,726 @@ class LevelSession:
         final_pixel_size = int(base_size * data["visual"] * MIN_SCALE)
 
         self.player_radius = int((final_pixel_size // 2) * data["hitbox"])
+        assets = self.game.assets
+
+        # cijfers en labels een keer renderen, de HUD blit daarna alleen nog glyphs
+        self.score_glyphs = assets.get(("glyphs", FONT_SCORE, WHITE), lambda: hud.GlyphAtlas(FONT_SCORE, WHITE, ["Score: "]))
+        self.lives_glyphs = assets.get(("glyphs", FONT_SCORE, RED), lambda: hud.GlyphAtlas(FONT_SCORE, RED, ["Lives: "]))
         try:
-            self.player_image = pygame.image.load(f"images/{self.game.current_skin}").convert_alpha()
-            self.player_image = pygame.transform.scale(self.player_image, (final_pixel_size, final_pixel_size))
-            self.player_image_flipped = pygame.transform.flip(self.player_image, False, True)
+            skin_path = f"images/{self.game.current_skin}"
+            self.player_image = assets.image(skin_path, (final_pixel_size, final_pixel_size))
+            self.player_image_flipped = assets.get(("flipped", skin_path, final_pixel_size),
+                                                   lambda: pygame.transform.flip(self.player_image, False, True))
+            # kanteling is player_vx * -2.5 en player_vx kan nooit boven player_max_speed
+            max_tilt = self.player_max_speed * 2.5
+            self.player_atlas = assets.get(("atlas", skin_path, final_pixel_size, max_tilt, self.tilt_step),
+                                           lambda: sprites.RotationAtlas(self.player_image, max_tilt, self.tilt_step))
+            self.player_atlas_flipped = assets.get(("atlas_flipped", skin_path, final_pixel_size, max_tilt, self.tilt_step),
+                                                   lambda: sprites.RotationAtlas(self.player_image_flipped, max_tilt, self.tilt_step))
         except:
             self.player_image = None
             self.player_image_flipped = None
+            self.player_atlas = None
+            self.player_atlas_flipped = None
 
         self.bg_images = []
         self.bg_images2 = []
         for i in range(1, 5):
+            if not self.game.parallax_enabled:
+                break
             try:
-                img = pygame.image.load(f"images/bgob{i}.png").convert()
-                img = pygame.transform.scale(img, SCREEN_SIZE)
-                self.bg_images.append(img)
-
-                img_stars = pygame.image.load("images/stars.png").convert_alpha()
-                img_stars = pygame.transform.scale(img_stars, SCREEN_SIZE)
-                self.bg_images2.append(img_stars)
+                self.bg_images.append(assets.image(f"images/bgob{i}.png", SCREEN_SIZE, alpha=False))
+                self.bg_images2.append(assets.image("images/stars.png", SCREEN_SIZE))
             except:
                 pass
         self.bg_scroll = 0
         self.current_bg_index = 0
 
         try:
-            self.background_image = pygame.image.load("images/galaxy.png").convert()
-            self.background_image = pygame.transform.scale(self.background_image, SCREEN_SIZE)
+            self.background_image = assets.image("images/galaxy.png", SCREEN_SIZE, alpha=False)
         except:
             self.background_image = None
 
         try:
-            self.meteor_small = pygame.image.load("images/neptunus.png").convert_alpha()
-            self.meteor_medium = pygame.image.load("images/mars.png").convert_alpha()
-            self.meteor_large = pygame.image.load("images/jupiter.png").convert_alpha()
+            self.meteor_small = assets.image("images/neptunus.png")
+            self.meteor_medium = assets.image("images/mars.png")
+            self.meteor_large = assets.image("images/jupiter.png")
         except:
             self.meteor_small = None
             self.meteor_medium = None
             self.meteor_large = None
 
+        # alle mogelijke planeetgroottes (ook de kinderen van een splitter) vooraf schalen
+        for size in range(max(1, int(18 * MIN_SCALE)), max(1, int(65 * MIN_SCALE)) + 1):
+            self.meteor_image(size)
+            self.tracker_rings.get(int(size // 2 + (5 * MIN_SCALE)))
+            self.splitter_rings.get(max(1, int((size // 2) + (8 * MIN_SCALE))))
+        self.shield_rings.get(self.player_radius + 10)
+
         try:
             heart_size = int(30 * MIN_SCALE)
-            self.heart_image = pygame.image.load("images/lives.png").convert_alpha()
-            self.heart_image = pygame.transform.scale(self.heart_image, (heart_size, heart_size))
+            self.heart_image = assets.image("images/lives.png", (heart_size, heart_size))
         except:
             self.heart_image = None
 
         try:
-            self.portal_image = pygame.image.load("images/portal.png").convert_alpha()
             portal_w = max(1, int(200 * MIN_SCALE))
             portal_h = max(1, int(40 * MIN_SCALE))
-            self.portal_image = pygame.transform.scale(self.portal_image, (portal_w, portal_h))
+            self.portal_image = assets.image("images/portal.png", (portal_w, portal_h))
         except:
             self.portal_image = None
 
         try:
             pu_size = int(40 * MIN_SCALE)
-            self.pu_shield_img = pygame.image.load("images/shield.png").convert_alpha()
-            self.pu_shield_img = pygame.transform.scale(self.pu_shield_img, (pu_size, pu_size))
-            self.pu_life_img = pygame.image.load("images/lives.png").convert_alpha()
-            self.pu_life_img = pygame.transform.scale(self.pu_life_img, (pu_size, pu_size))
-            self.pu_bonus_img = pygame.image.load("images/bonus.png").convert_alpha()
-            self.pu_bonus_img = pygame.transform.scale(self.pu_bonus_img, (pu_size, pu_size))
+            self.pu_shield_img = assets.image("images/shield.png", (pu_size, pu_size))
+            self.pu_life_img = assets.image("images/lives.png", (pu_size, pu_size))
+            self.pu_bonus_img = assets.image("images/bonus.png", (pu_size, pu_size))
         except:
             self.pu_shield_img = None
             self.pu_life_img = None
             self.pu_bonus_img = None
 
-    def make_block(self, current_score, level_mode="down"):
-        base_size = random.randint(20, 65)
-        size = max(1, int(base_size * MIN_SCALE))
+        if self.heart_image:
+            self.lives_pos = (max(0, int(20 * MIN_SCALE)), max(0, int(20 * MIN_SCALE)))
+        else:
+            self.lives_pos = (20, 20)
+        self.lives_layer = hud.LivesLayer(self.heart_image, max(1, int(35 * MIN_SCALE)), self.lives_glyphs)
+
+    def meteor_image(self, size):
+        if not (self.meteor_small and self.meteor_medium and self.meteor_large):
+            return None
+        if size < 40 * MIN_SCALE:
+            return self.game.assets.image("images/neptunus.png", (size, size))
+        if size < 50 * MIN_SCALE:
+            return self.game.assets.image("images/mars.png", (size, size))
+        return self.game.assets.image("images/jupiter.png", (size, size))
+
+    def spawn_blocks(self, blocks, indices, current_score, level_mode="down"):
+        amount = len(indices)
+        if amount == 0:
+            return
+        rng = self.rng
+        size = np.maximum(1, (rng.integers(20, 66, amount) * MIN_SCALE).astype(np.int32))
         offset = max(1, int(500 * MIN_SCALE))
 
         if level_mode == "side":
-            x = random.randint(SCREEN_WIDTH, SCREEN_WIDTH + offset)
-            y = random.randint(0, max(1, SCREEN_HEIGHT - size))
+            x = rng.integers(SCREEN_WIDTH, SCREEN_WIDTH + offset + 1, amount)
+            y = rng.integers(0, np.maximum(1, SCREEN_HEIGHT - size) + 1)
         elif level_mode == "up":
-            x = random.randint(0, max(1, SCREEN_WIDTH - size))
-            y = random.randint(SCREEN_HEIGHT, SCREEN_HEIGHT + offset)
+            x = rng.integers(0, np.maximum(1, SCREEN_WIDTH - size) + 1)
+            y = rng.integers(SCREEN_HEIGHT, SCREEN_HEIGHT + offset + 1, amount)
         else:
-            x = random.randint(0, max(1, SCREEN_WIDTH - size))
-            y = random.randint(-offset, 0)
-
-        is_splitter = False
-        is_tracker = False
-        is_zigzag = False
+            x = rng.integers(0, np.maximum(1, SCREEN_WIDTH - size) + 1)
+            y = rng.integers(-offset, 1, amount)
 
-        if random.random() < 0.10:
-            is_splitter = True
-        
-        elif (current_score // 10) >= 500 and random.random() < 0.30:
-            is_tracker = True
-        
-        elif current_score > 2500 and random.random() < 0.3:
-            is_zigzag = True
+        is_splitter = rng.random(amount) < self.splitter_chance
+        is_tracker = ~is_splitter & ((current_score // 10) >= 500) & (rng.random(amount) < 0.30)
+        is_zigzag = ~is_splitter & ~is_tracker & (current_score > 2500) & (rng.random(amount) < 0.3)
 
         drift_strength = 1.2 * MIN_SCALE
-        
-        block_img = None
-        if self.meteor_small and self.meteor_medium and self.meteor_large:
-            boundary_small = 40 * MIN_SCALE
-            boundary_medium = 50 * MIN_SCALE
-            
-            if size < boundary_small:
-                base_img = self.meteor_small
-            elif size < boundary_medium:
-                base_img = self.meteor_medium
-            else:
-                base_img = self.meteor_large
-            
-            block_img = pygame.transform.scale(base_img, (size, size))
-        
-        return {
-            "x": float(x),
-            "y": float(y),
-            "size": size,
-            "image": block_img,
-            "splitter": is_splitter,
-            "split_done": False,
-            "vx": random.uniform(-drift_strength, drift_strength),
-            "vy": random.uniform(-0.5 * MIN_SCALE, 0.5 * MIN_SCALE),
-            "zigzag": is_zigzag,
-            "zigzag_offset": random.randint(0, 10000),
-            "tracker": is_tracker
-        }
-
-    def create_blocks(self, level_mode="down"):
-        return [self.make_block(0, level_mode) for _ in range(self.block_count)]
 
-    def respawn_block(self, block,current_score, level_mode):
-        block.update(self.make_block(current_score, level_mode))
+        blocks.x[indices] = x
+        blocks.y[indices] = y
+        blocks.prev_x[indices] = x
+        blocks.prev_y[indices] = y
+        blocks.size[indices] = size
+        blocks.flags[indices] = is_splitter * BLOCK_SPLITTER + is_tracker * BLOCK_TRACKER + is_zigzag * BLOCK_ZIGZAG
+        blocks.vx[indices] = rng.uniform(-drift_strength, drift_strength, amount)
+        blocks.vy[indices] = rng.uniform(-0.5 * MIN_SCALE, 0.5 * MIN_SCALE, amount)
+        blocks.zigzag_offset[indices] = rng.integers(0, 10001, amount)
+        for i, block_size in zip(indices.tolist(), size.tolist()):
+            blocks.images[i] = self.meteor_image(block_size)
 
-    def maybe_split(self, blocks, block, level_mode, max_allowed_blocks):
-        if not block["splitter"] or block["split_done"]:
-            return
-        if len(blocks) >= max_allowed_blocks:
+    def create_blocks(self, level_mode="down"):
+        blocks = self.blocks
+        blocks.reset()
+        self.spawn_blocks(blocks, blocks.append(self.block_count), 0, level_mode)
+        return blocks
+
+    def split_blocks(self, blocks, level_mode, max_allowed_blocks):
+        n = blocks.count
+        if n >= max_allowed_blocks:
             return
 
+        ready = (blocks.flags[:n] & (BLOCK_SPLITTER | BLOCK_SPLIT_DONE)) == BLOCK_SPLITTER
         if level_mode == "side":
-            if abs(block["x"] - CENTER_X) > self.split_trigger_margin:
-                return
+            ready &= np.abs(blocks.x[:n] - CENTER_X) <= self.split_trigger_margin
         else:
-            if abs(block["y"] - CENTER_Y) > self.split_trigger_margin:
-                return
-            
-        if audio.sfx_enabled:
-            audio.play_sfx(audio_path.split_sound, 0.2)
+            ready &= np.abs(blocks.y[:n] - CENTER_Y) <= self.split_trigger_margin
+
+        # elke split voegt 2 planeten toe, dus niet meer splitsen dan er plaats is
+        parents = np.flatnonzero(ready)[:int(max_allowed_blocks - n + 1) // 2]
+        if len(parents) == 0:
+            return
 
-        block["split_done"] = True
-        parent_size = block["size"]
-        child_size = max(int(18 * MIN_SCALE), parent_size // 2)
-        cx, cy = block["x"] + parent_size / 4, block["y"] + parent_size / 4
+        for _ in parents:
+            if audio.sfx_enabled:
+                audio.play_sfx(audio_path.split_sound, 0.2)
 
-        base_props = {"splitter": False, "split_done": True, "tracker": False, "zigzag": False, "zigzag_offset": 0}
+        blocks.flags[parents] |= BLOCK_SPLIT_DONE
+        parent_size = blocks.size[parents]
+        child_size = np.maximum(int(18 * MIN_SCALE), parent_size // 2)
+        cx = blocks.x[parents] + parent_size / 4
+        cy = blocks.y[parents] + parent_size / 4
+        spread = np.tile([-self.split_child_spread, self.split_child_spread], len(parents))
 
         if level_mode == "side":
-            c1 = {"x": cx, "y": cy, "size": child_size, "vx": block["vx"], "vy": -self.split_child_spread, **base_props}
-            c2 = {"x": cx, "y": cy, "size": child_size, "vx": block["vx"], "vy": +self.split_child_spread, **base_props}
+            child_vx = np.repeat(blocks.vx[parents], 2)
+            child_vy = spread
         else:
-            c1 = {"x": cx, "y": cy, "size": child_size, "vx": -self.split_child_spread, "vy": block["vy"], **base_props}
-            c2 = {"x": cx, "y": cy, "size": child_size, "vx": +self.split_child_spread, "vy": block["vy"], **base_props}
-
-        for child in [c1, c2]:
-            if self.meteor_small and self.meteor_medium and self.meteor_large:
-                boundary_small = 40 * MIN_SCALE
-                boundary_medium = 50 * MIN_SCALE
-                if child["size"] < boundary_small: base = self.meteor_small
-                elif child["size"] < boundary_medium: base = self.meteor_medium
-                else: base = self.meteor_large
-                child["image"] = pygame.transform.scale(base, (child["size"], child["size"]))
-            else: child["image"] = None
-
-        blocks.extend([c1, c2])
+            child_vx = spread
+            child_vy = np.repeat(blocks.vy[parents], 2)
+
+        children = blocks.append(2 * len(parents))
+        blocks.x[children] = np.repeat(cx, 2)
+        blocks.y[children] = np.repeat(cy, 2)
+        blocks.prev_x[children] = blocks.x[children]
+        blocks.prev_y[children] = blocks.y[children]
+        blocks.size[children] = np.repeat(child_size, 2)
+        blocks.vx[children] = child_vx
+        blocks.vy[children] = child_vy
+        blocks.flags[children] = BLOCK_SPLIT_DONE
+        blocks.zigzag_offset[children] = 0
+        for i, block_size in zip(children.tolist(), blocks.size[children].tolist()):
+            blocks.images[i] = self.meteor_image(block_size)
 
     def update_blocks(self, blocks, fall_speed, current_score, level_mode, dt_factor, player_x, player_y):
         extra_planeten = (current_score // 800)
         max_allowed = self.block_count + extra_planeten + self.split_max_extra
 
-        tracking_strength = 1.5 * MIN_SCALE * dt_factor 
-
-        for block in blocks:
-            if block.get("zigzag") == True:
-                tijd = pygame.time.get_ticks() + block["zigzag_offset"]
-                golf = math.sin(tijd * 0.005) * (4 * MIN_SCALE) * dt_factor
-                
-                if level_mode == "side":
-                    block["y"] += golf
-                else:
-                    block["x"] += golf
-
-            # Tracker logic
-            if block.get("tracker") == True:
-                block_center_x = block["x"] + block["size"] / 2
-                block_center_y = block["y"] + block["size"] / 2
-                
-                if level_mode == "side":
-                    if block_center_y < player_y:
-                        block["y"] += tracking_strength
-                    elif block_center_y > player_y:
-                        block["y"] -= tracking_strength
-                else:
-                    if block_center_x < player_x:
-                        block["x"] += tracking_strength
-                    elif block_center_x > player_x:
-                        block["x"] -= tracking_strength
-
-            adjusted_fall_speed = fall_speed * dt_factor
-            adjusted_vx = block["vx"] * dt_factor
-            adjusted_vy = block["vy"] * dt_factor
-            
-            s = block["size"]
+        n = blocks.count
+        x = blocks.x[:n]
+        y = blocks.y[:n]
+        size = blocks.size[:n]
+        flags = blocks.flags[:n]
+        blocks.prev_x[:n] = x
+        blocks.prev_y[:n] = y
+
+        zigzag = (flags & BLOCK_ZIGZAG) != 0
+        if zigzag.any():
+            tijd = self.sim_time + blocks.zigzag_offset[:n][zigzag]
+            golf = np.sin(tijd * 0.005) * (4 * MIN_SCALE) * dt_factor
+            if level_mode == "side":
+                y[zigzag] += golf
+            else:
+                x[zigzag] += golf
 
+        # Tracker logic
+        tracker = (flags & BLOCK_TRACKER) != 0
+        if tracker.any():
+            tracking_strength = 1.5 * MIN_SCALE * dt_factor
             if level_mode == "side":
-                block["x"] += fall_speed
-                block["y"] += block["vy"]
-                block["x"] += block["vx"]
-                self.maybe_split(blocks, block, level_mode, max_allowed)
-                if block["x"] < -s:
-                    self.respawn_block(block, current_score, level_mode)
+                y[tracker] += np.sign(player_y - (y[tracker] + size[tracker] / 2)) * tracking_strength
             else:
-                block["y"] += fall_speed
-                block["x"] += block["vx"]
-                block["y"] += block["vy"]
-                self.maybe_split(blocks, block, level_mode, max_allowed)
-                if fall_speed > 0 and block["y"] > SCREEN_HEIGHT:
-                    self.respawn_block(block, current_score, "down")
-                elif fall_speed < 0 and block["y"] < -s:
-                    self.respawn_block(block, current_score, "up")
-
-        if len(blocks) < self.block_count + extra_planeten:
-            blocks.append(self.make_block(current_score, level_mode))
-
-    def render_frame(self, surface, blocks, px, py, score, lives, immunity, portal_rect, portal_active, player_vx, level_flipped):
-        
-        offset_x = 0
-        offset_y = 0
-        if self.shake_intensity > 0:
-            offset_x = random.randint(-self.shake_intensity, self.shake_intensity)
-            offset_y = random.randint(-self.shake_intensity, self.shake_intensity)
-            self.shake_intensity = max(0, self.shake_intensity - 1)
-        
-        self.canvas.fill(BLACK) 
+                x[tracker] += np.sign(player_x - (x[tracker] + size[tracker] / 2)) * tracking_strength
+
+        if level_mode == "side":
+            x += (fall_speed + blocks.vx[:n]) * dt_factor
+            y += blocks.vy[:n] * dt_factor
+            self.spawn_blocks(blocks, np.flatnonzero(x < -size), current_score, level_mode)
+        else:
+            y += (fall_speed + blocks.vy[:n]) * dt_factor
+            x += blocks.vx[:n] * dt_factor
+            if fall_speed > 0:
+                self.spawn_blocks(blocks, np.flatnonzero(y > SCREEN_HEIGHT), current_score, "down")
+            elif fall_speed < 0:
+                self.spawn_blocks(blocks, np.flatnonzero(y < -size), current_score, "up")
+
+        self.split_blocks(blocks, level_mode, max_allowed)
+
+        if blocks.count < self.block_count + extra_planeten:
+            self.spawn_blocks(blocks, blocks.append(1), current_score, level_mode)
+
+    def draw_background(self, target):
+        target.fill(BLACK)
 
         if self.bg_images:
             curr_img = self.bg_images[self.current_bg_index]
-            self.canvas.blit(curr_img, (0, self.bg_scroll))
+            target.blit(curr_img, (0, self.bg_scroll))
             
             if self.bg_scroll > 0:
                 nxt_idx = (self.current_bg_index + 1) % len(self.bg_images)
-                self.canvas.blit(self.bg_images[nxt_idx], (0, self.bg_scroll - SCREEN_HEIGHT))
+                target.blit(self.bg_images[nxt_idx], (0, self.bg_scroll - SCREEN_HEIGHT))
             elif self.bg_scroll < 0:
                 prev_idx = (self.current_bg_index - 1) % len(self.bg_images)
-                self.canvas.blit(self.bg_images[prev_idx], (0, self.bg_scroll + SCREEN_HEIGHT))
+                target.blit(self.bg_images[prev_idx], (0, self.bg_scroll + SCREEN_HEIGHT))
 
         if self.bg_images2:
             curr_stars = self.bg_images2[0]
-            self.canvas.blit(curr_stars, (0, self.bg_scroll2))
+            target.blit(curr_stars, (0, self.bg_scroll2))
             
             if self.bg_scroll2 > 0:
-                self.canvas.blit(curr_stars, (0, self.bg_scroll2 - SCREEN_HEIGHT))
+                target.blit(curr_stars, (0, self.bg_scroll2 - SCREEN_HEIGHT))
             elif self.bg_scroll2 < 0:
-                self.canvas.blit(curr_stars, (0, self.bg_scroll2 + SCREEN_HEIGHT))
+                target.blit(curr_stars, (0, self.bg_scroll2 + SCREEN_HEIGHT))
         
         elif self.background_image:
-            self.canvas.blit(self.background_image, (0, 0))
+            target.blit(self.background_image, (0, 0))
+
+    def restore_background(self, target, rect):
+        if self.background_image:
+            target.blit(self.background_image, rect, rect)
+        else:
+            target.fill(BLACK, rect)
 
+    def draw_sprites(self, target, blocks, px, py, immunity, portal_rect, player_vx, level_flipped, alpha=1.0):
+        rects = []
         if portal_rect and self.portal_image:
-            self.canvas.blit(self.portal_image, portal_rect)
+            rects.append(target.blit(self.portal_image, portal_rect))
 
         for pu in self.powerups:
-            if pu["type"] == "SHIELD":
+            if pu.type == PowerUpType.SHIELD:
                 img = self.pu_shield_img
-            elif pu["type"] == "LIFE":
+            elif pu.type == PowerUpType.EXTRA_LIFE:
                 img = self.pu_life_img
-            elif pu["type"] == "BONUS":
+            elif pu.type == PowerUpType.BONUS:
                 img = self.pu_bonus_img
             else: img = None
             
             if img:
-                self.canvas.blit(img, (int(pu["x"]), int(pu["y"])))
+                rects.append(target.blit(img, (int(pu.x), int(pu.y))))
             else:
-                color = (0, 255, 255) if pu["type"] == "SHIELD" else (255, 50, 50)
-                center_pos = (int(pu["x"] + pu["size"]/2), int(pu["y"] + pu["size"]/2))
-                pygame.draw.circle(self.canvas, color, center_pos, pu["size"]//2)
-
-        for b in blocks:
-            bx = int(b["x"])
-            by = int(b["y"])
-            if b.get("image") is None:
-                if self.meteor_small and self.meteor_medium and self.meteor_large:
-                    boundary_small = 40 * MIN_SCALE
-                    boundary_medium = 50 * MIN_SCALE
-                    if b["size"] < boundary_small: base_img = self.meteor_small
-                    elif b["size"] < boundary_medium: base_img = self.meteor_medium
-                    else: base_img = self.meteor_large
-                    b["image"] = pygame.transform.scale(base_img, (b["size"], b["size"]))
-                else: b["image"] = None
-
-            if b.get("image"):
-                self.canvas.blit(b["image"], (bx, by))
+                color = (0, 255, 255) if pu.type == PowerUpType.SHIELD else (255, 50, 50)
+                center_pos = (int(pu.x + pu.size/2), int(pu.y + pu.size/2))
+                rects.append(pygame.draw.circle(target, color, center_pos, pu.size//2))
+
+        n = blocks.count
+        prev_x, prev_y = blocks.prev_x[:n], blocks.prev_y[:n]
+        block_xs = (prev_x + (blocks.x[:n] - prev_x) * alpha).astype(int).tolist()
+        block_ys = (prev_y + (blocks.y[:n] - prev_y) * alpha).astype(int).tolist()
+        block_sizes = blocks.size[:n].tolist()
+        block_flags = blocks.flags[:n].tolist()
+        for i in range(n):
+            bx, by, size, flags = block_xs[i], block_ys[i], block_sizes[i], block_flags[i]
+            if blocks.images[i] is None:
+                blocks.images[i] = self.meteor_image(size)
+
+            if blocks.images[i]:
+                rects.append(target.blit(blocks.images[i], (bx, by)))
             else:
-                pygame.draw.rect(surface, WHITE, (int(b["x"]), int(b["y"]), b["size"], b["size"]))
+                rects.append(pygame.draw.rect(target, WHITE, (bx, by, size, size)))
 
-            if b.get("tracker") == True:
-                center = (int(b["x"] + b["size"] // 2), int(b["y"] + b["size"] // 2))
-                radius = int(b["size"] // 2 + (5 * MIN_SCALE))
-                pygame.draw.circle(self.canvas, (255, 50, 50), center, radius, 2)
+            if flags & BLOCK_TRACKER:
+                center = (bx + size // 2, by + size // 2)
+                radius = int(size // 2 + (5 * MIN_SCALE))
+                rects.append(self.tracker_rings.draw(target, center, radius))
 
-            if b["splitter"] and not b["split_done"]:
-                radius = int((b["size"] // 2) + (8 * MIN_SCALE))
-                pygame.draw.circle(self.canvas, YELLOW, (int(b["x"] + b["size"] // 2), int(b["y"] + b["size"] // 2)), max(1, radius), 3)
+            if flags & (BLOCK_SPLITTER | BLOCK_SPLIT_DONE) == BLOCK_SPLITTER:
+                radius = int((size // 2) + (8 * MIN_SCALE))
+                rects.append(self.splitter_rings.draw(target, (bx + size // 2, by + size // 2), max(1, radius)))
 
         if immunity <= 0 or (int(immunity) // 5) % 2 == 0:
-            if self.player_image:
-                if level_flipped and self.player_image_flipped:
-                    img_to_draw = self.player_image_flipped
-                    tilt_angle = -(player_vx * -2.5) 
+            if self.player_atlas:
+                if level_flipped and self.player_atlas_flipped:
+                    rects.append(self.player_atlas_flipped.draw(target, -(player_vx * -2.5), (int(px), int(py))))
                 else:
-                    img_to_draw = self.player_image
-                    tilt_angle = player_vx * -2.5
-
-                rotated_player = pygame.transform.rotozoom(img_to_draw, tilt_angle, 1.0)
-
-                player_rect = rotated_player.get_rect(center=(int(px), int(py)))
-                self.canvas.blit(rotated_player, player_rect)
+                    rects.append(self.player_atlas.draw(target, player_vx * -2.5, (int(px), int(py))))
             else:
-                pygame.draw.circle(surface, GAME_BLUE, (int(px), int(py)), self.player_radius)
+                rects.append(pygame.draw.circle(target, GAME_BLUE, (int(px), int(py)), self.player_radius))
 
             if self.shield_active:
-                pygame.draw.circle(self.canvas, (0, 200, 255), (int(px), int(py)), self.player_radius + 10, 3)
+                rects.append(self.shield_rings.draw(target, (int(px), int(py)), self.player_radius + 10))
 
-        surface.blit(self.canvas, (offset_x, offset_y))
+        return rects
 
-        current_display_score = int(score // 10)
-        
-        if current_display_score != self.last_rendered_score:
-            self.score_surface = FONT_SCORE.render(f"Score: {current_display_score}", True, WHITE)
-            self.last_rendered_score = current_display_score
-        
+    def draw_hud(self, surface, score, lives):
+        rects = []
         score_x = SCREEN_WIDTH - max(1, int(200 * MIN_SCALE))
         score_y = max(0, int(20 * MIN_SCALE))
-        
-        if self.score_surface:
-            surface.blit(self.score_surface, (score_x, score_y))
+        rects.append(self.score_glyphs.draw(surface, "Score: ", score // 10, (score_x, score_y)))
 
-        if self.heart_image:
-            start_x = max(0, int(20 * MIN_SCALE))
-            y_pos = max(0, int(20 * MIN_SCALE))
-            spacing = max(1, int(35 * MIN_SCALE))
-            for i in range(lives):
-                surface.blit(self.heart_image, (start_x + (i * spacing), y_pos))
-        else:
-            surface.blit(FONT_SCORE.render(f"Lives: {lives}", True, RED), (20, 20))
+        rects.append(self.lives_layer.draw(surface, lives, self.lives_pos))
+        return rects
 
-        pygame.display.flip()
+    def render_frame(self, surface, alpha=1.0):
+        blocks = self.blocks
+        px = self.prev_x + (self.x - self.prev_x) * alpha
+        py = self.prev_y + (self.y - self.prev_y) * alpha
+        score, lives, immunity = self.score, self.lives, self.immunity_timer
+        portal_rect, player_vx, level_flipped = self.portal_rect, self.player_vx, self.level_flipped
 
-    def run(self, screen) -> GameState:
-        audio.play_music(audio_path.gameplay_music, 0.4)
-        self.load_assets()
+        offset_x = 0
+        offset_y = 0
+        if self.shake_intensity > 0:
+            offset_x = random.randint(-self.shake_intensity, self.shake_intensity)
+            offset_y = random.randint(-self.shake_intensity, self.shake_intensity)
+            self.shake_intensity = max(0, self.shake_intensity - 1)
 
-        c = self.game.controls
-        clock = pygame.time.Clock()
+        # met scrollende achtergronden of schudden verandert toch het hele scherm
+        if self.game.dirty_rendering and not self.bg_images and not self.bg_images2 and offset_x == 0 and offset_y == 0:
+            if not self.dirty_ready:
+                self.draw_background(surface)
+                self.dirty_rects = self.draw_sprites(surface, blocks, px, py, immunity, portal_rect, player_vx, level_flipped, alpha)
+                self.dirty_rects += self.draw_hud(surface, score, lives)
+                pygame.display.flip()
+                self.dirty_ready = True
+                return
+
+            for rect in self.dirty_rects:
+                self.restore_background(surface, rect)
+            rects = self.draw_sprites(surface, blocks, px, py, immunity, portal_rect, player_vx, level_flipped, alpha)
+            rects += self.draw_hud(surface, score, lives)
+            pygame.display.update(self.dirty_rects + rects)
+            self.dirty_rects = rects
+            return
+
+        self.dirty_ready = False
+        self.draw_background(self.canvas)
+        self.draw_sprites(self.canvas, blocks, px, py, immunity, portal_rect, player_vx, level_flipped, alpha)
+        surface.blit(self.canvas, (offset_x, offset_y))
+        self.draw_hud(surface, score, lives)
 
-        x, y = CENTER_X, SCREEN_HEIGHT - int(100 * MIN_SCALE)
-        player_vx = 0.0
-        player_vy = 0.0
+        pygame.display.flip()
 
-        blocks = self.create_blocks("down")
-        score = 0
-        lives = 3
-        immunity_timer = 0
+    def reset_state(self):
+        self.x, self.y = CENTER_X, SCREEN_HEIGHT - int(100 * MIN_SCALE)
+        self.prev_x, self.prev_y = self.x, self.y
+        self.player_vx = 0.0
+        self.player_vy = 0.0
+
+        self.random.seed(self.seed)
+        self.rng = np.random.default_rng(self.seed)
+        self.replay = replay.Replay(self.seed, self.sim_hz, SCREEN_SIZE, self.game.current_skin)
+
+        self.create_blocks("down")
+        self.score = 0
+        self.lives = 3
+        self.immunity_timer = 0
+        self.sim_time = 0.0
+
+        self.level_flipped = False
+        self.next_portal_score = 250
+        self.portal_rect = None
+        self.portal_active = False
+
+        self.hits_taken = 0
+        self.shield_saves = 0
+        self.powerups_collected = 0
+
+    def step(self, input_x, input_y, dt_factor):
+        blocks = self.blocks
+        if self.replay is not None:
+            self.replay.record(input_x, input_y)
+        self.prev_x, self.prev_y = self.x, self.y
+        self.sim_time += dt_factor * 1000 / 60
+
+        if self.immunity_timer > 0:
+            self.immunity_timer -= 1 * dt_factor
         
-        level_flipped = False  
-        next_portal_score = 250
+        if self.shield_active:
+            self.shield_timer -= 1 * dt_factor
+            if self.shield_timer <= 0:
+                self.shield_active = False
 
-        while True:
-            dt_ms = clock.tick(60) 
-            dt = dt_ms / 1000.0 
+        current_score_int = int(self.score // 10)
+        self.portal_active = (current_score_int >= self.next_portal_score)
 
-            if dt > 0.1: dt = 0.1
+        if self.portal_active:
+            input_x = 0
+            input_y = 0
 
-            dt_factor = dt * 60
+        if input_x != 0:
+            self.player_vx += input_x * self.player_accel * dt_factor
+        else:
+            self.player_vx *= math.pow(self.player_friction, dt_factor)
+        if input_y != 0:
+            self.player_vy += input_y * self.player_accel * dt_factor
+        else:
+            self.player_vy *= math.pow(self.player_friction, dt_factor)
 
-            if immunity_timer > 0:
-                immunity_timer -= 1 * dt_factor
-            
-            if self.shield_active:
-                self.shield_timer -= 1 * dt_factor
-                if self.shield_timer <= 0:
-                    self.shield_active = False
+        speed = math.sqrt(self.player_vx * self.player_vx + self.player_vy * self.player_vy)
+        if speed > self.player_max_speed:
+            scale = self.player_max_speed / speed
+            self.player_vx *= scale
+            self.player_vy *= scale
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return GameState.QUIT
-                
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        return GameState.TITLE
+        if abs(self.player_vx) < 0.1:
+            self.player_vx = 0.0
+        if abs(self.player_vy) < 0.1:
+            self.player_vy = 0.0
+
+        self.x += self.player_vx * dt_factor
+        self.y += self.player_vy * dt_factor
 
-                if event.type == pygame.VIDEORESIZE:
-                    old_w, old_h = SCREEN_WIDTH, SCREEN_HEIGHT
-                    rx = x / old_w if old_w else 0.5
-                    ry = y / old_h if old_h else 0.5
-
-                    self.game.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
-                    screen = self.game.screen
-                    recalc_display_metrics(screen)
-                    self.canvas = pygame.Surface(SCREEN_SIZE)
-                    self.game._load_menu_background()
-                    self.apply_scaling()
-                    self.load_assets()
+        if self.bg_images:
+            scroll_delta = self.bg_speed * dt_factor
+            if not self.level_flipped:
+                self.bg_scroll += scroll_delta
+                if self.bg_scroll >= SCREEN_HEIGHT:
+                    self.bg_scroll = 0
+                    self.current_bg_index = (self.current_bg_index + 1) % len(self.bg_images)
+            else:
+                self.bg_scroll -= scroll_delta
+                if self.bg_scroll <= -SCREEN_HEIGHT:
                     self.bg_scroll = 0
-                    self.current_bg_index = 0
+                    self.current_bg_index = (self.current_bg_index - 1) % len(self.bg_images)
 
-                    x = rx * SCREEN_WIDTH
-                    y = ry * SCREEN_HEIGHT
+        if self.bg_images2:
+            scroll_delta2 = self.bg_speed2 * dt_factor
+            if not self.level_flipped:
+                self.bg_scroll2 += scroll_delta2
+                if self.bg_scroll2 >= SCREEN_HEIGHT:
+                    self.bg_scroll2 = 0
+            else:
+                self.bg_scroll2 -= scroll_delta2
+                if self.bg_scroll2 <= -SCREEN_HEIGHT:
+                    self.bg_scroll2 = 0
 
-                    for block in blocks:
-                        block["image"] = None
+        self.score += 1 * dt_factor
 
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
-                            return GameState.TITLE
+        if not self.level_flipped:
+            fall_speed = min(self.start_speed + (self.score * self.speed_increase), self.max_fall_speed)
+            level_mode = "down"
+        else:
+            fall_speed = max(-self.start_speed - (self.score * self.speed_increase), -self.max_fall_speed)
+            level_mode = "up"
 
-            current_score_int = int(score // 10)
-            portal_active = (current_score_int >= next_portal_score)
+        self.update_blocks(blocks, fall_speed, self.score, level_mode, dt_factor, self.x, self.y)
 
-            keys = pygame.key.get_pressed()
-            input_x = 0
-            input_y = 0
+        self.x = max(self.player_radius, min(SCREEN_WIDTH - self.player_radius, self.x))
+        self.y = max(self.player_radius, min(SCREEN_HEIGHT - self.player_radius, self.y))
+
+        player_rect = pygame.Rect(int(self.x) - self.player_radius, int(self.y) - self.player_radius, self.player_radius * 2, self.player_radius * 2)
 
-            if not portal_active:
-                if keys[c.left]:
-                    input_x -= 1
-                if keys[c.right]:
-                    input_x += 1
-                if keys[c.up]:
-                    input_y -= 1
-                if keys[c.down]:
-                    input_y += 1
-
-            if input_x != 0:
-                player_vx += input_x * self.player_accel * dt_factor
+        if self.random.random() < self.powerup_spawn_chance * dt_factor and not self.portal_active:
+            rand = self.random.random()
+            if rand > 0.8: pu_type = PowerUpType.BONUS
+            elif rand > 0.2: pu_type = PowerUpType.SHIELD
+            else: pu_type = PowerUpType.EXTRA_LIFE
+            
+            if self.level_flipped:
+                start_y = SCREEN_HEIGHT + 50
             else:
-                player_vx *= math.pow(self.player_friction, dt_factor)
-            if input_y != 0:
-                player_vy += input_y * self.player_accel * dt_factor
+                start_y = -50
+                
+            self.powerups.append(self.powerup_pool.acquire(pu_type, self.random.randint(50, SCREEN_WIDTH-50), start_y, int(40*MIN_SCALE)))
+
+        for pu in self.powerups[:]:
+            pu.update(fall_speed, dt_factor)
+            if pu.y > SCREEN_HEIGHT + 100 or pu.y < -200:
+                self.powerups.remove(pu)
+                self.powerup_pool.release(pu)
+
+        portal_rect = None
+        p_w = max(1, int(200 * MIN_SCALE))
+        p_h = max(1, int(40 * MIN_SCALE))
+
+        if self.portal_active:
+            if not self.level_flipped:
+                portal_rect = pygame.Rect(int(CENTER_X - (p_w // 2)), int(20 * MIN_SCALE), p_w, p_h)
             else:
-                player_vy *= math.pow(self.player_friction, dt_factor)
-
-            speed = math.sqrt(player_vx * player_vx + player_vy * player_vy)
-            if speed > self.player_max_speed:
-                scale = self.player_max_speed / speed
-                player_vx *= scale
-                player_vy *= scale
-
-            if abs(player_vx) < 0.1:
-                player_vx = 0.0
-            if abs(player_vy) < 0.1:
-                player_vy = 0.0
-
-            x += player_vx * dt_factor
-            y += player_vy * dt_factor
-
-            if self.bg_images:
-                scroll_delta = self.bg_speed * dt_factor
-                if not level_flipped:
-                    self.bg_scroll += scroll_delta
-                    if self.bg_scroll >= SCREEN_HEIGHT:
-                        self.bg_scroll = 0
-                        self.current_bg_index = (self.current_bg_index + 1) % len(self.bg_images)
-                else:
-                    self.bg_scroll -= scroll_delta
-                    if self.bg_scroll <= -SCREEN_HEIGHT:
-                        self.bg_scroll = 0
-                        self.current_bg_index = (self.current_bg_index - 1) % len(self.bg_images)
-
-            if self.bg_images2:
-                scroll_delta2 = self.bg_speed2 * dt_factor
-                if not level_flipped:
-                    self.bg_scroll2 += scroll_delta2
-                    if self.bg_scroll2 >= SCREEN_HEIGHT:
-                        self.bg_scroll2 = 0
+                portal_rect = pygame.Rect(int(CENTER_X - (p_w // 2)), SCREEN_HEIGHT - int(40 * MIN_SCALE), p_w, p_h)
+        self.portal_rect = portal_rect
+
+        for pu in self.powerups[:]:
+            pu_r = pygame.Rect(pu.x, pu.y, pu.size, pu.size)
+            if player_rect.colliderect(pu_r):
+                if pu.type == PowerUpType.BONUS:
+                    self.bonus_collected += 50
+                    if audio.sfx_enabled: audio.play_sfx(audio_path.heal_sound, 0.5)
+                if pu.type == PowerUpType.SHIELD: 
+                    self.shield_active = True
+                    self.shield_timer = 300 
+                else: 
+                    self.lives = min(self.lives + 1, 4)
+                
+                if audio.sfx_enabled: audio.play_sfx(audio_path.heal_sound, 0.6)
+                self.powerups_collected += 1
+                self.powerups.remove(pu)
+                self.powerup_pool.release(pu)
+
+        if portal_rect:
+            dx, dy = portal_rect.centerx - self.x, portal_rect.centery - self.y
+            self.x += dx * 0.05 * dt_factor
+            self.y += dy * 0.05 * dt_factor
+            player_rect.center = (int(self.x), int(self.y))
+
+            if player_rect.colliderect(portal_rect):
+                self.level_flipped = not self.level_flipped 
+                self.next_portal_score += 250         
+
+                if self.level_flipped:
+                    self.x, self.y = CENTER_X, int(100 * MIN_SCALE)
+                    self.create_blocks("up")
                 else:
-                    self.bg_scroll2 -= scroll_delta2
-                    if self.bg_scroll2 <= -SCREEN_HEIGHT:
-                        self.bg_scroll2 = 0
+                    self.x, self.y = CENTER_X, SCREEN_HEIGHT - int(100 * MIN_SCALE)
+                    self.create_blocks("down")
+                
+                # teleport, dus niet interpoleren vanaf de oude positie
+                self.prev_x, self.prev_y = self.x, self.y
+                self.player_vx, self.player_vy = 0.0, 0.0
+                return None
 
-            score += 1 * dt_factor
+        hit = -1
+        if self.immunity_timer <= 0 and not self.portal_active:
+            hit = blocks.first_hit(self.x, self.y, self.player_radius, 6 * MIN_SCALE)
 
-            if not level_flipped:
-                fall_speed = min(self.start_speed + (score * self.speed_increase), self.max_fall_speed)
-                level_mode = "down"
+        if hit >= 0:
+            if self.shield_active:
+                self.shield_active = False
+                self.shield_timer = 0
+                self.immunity_timer = 60
+                self.shield_saves += 1
+                if audio.sfx_enabled:
+                    audio.play_sfx(audio_path.hit_sound, 0.3)
             else:
-                fall_speed = max(-self.start_speed - (score * self.speed_increase), -self.max_fall_speed)
-                level_mode = "up"
+                self.lives -= 1
+                self.hits_taken += 1
+                self.shake_intensity = 15
+                if self.lives > 0:
+                    audio.play_sfx(audio_path.hit_sound, 0.5)
+                    self.immunity_timer = 90 
+                else:
+                    self.game.last_base_score = self.score // 10
+                    self.game.last_bonus = self.bonus_collected
+                    self.game.last_score = (self.score // 10) + self.bonus_collected
+                    return GameState.GAMEOVER
+        return None
 
-            self.update_blocks(blocks, fall_speed, score, level_mode, dt_factor, x, y)
+    def simulate(self, input_source, max_ticks=None):
+        self.load_assets()
+        self.reset_state()
+        dt_factor = 60 / self.sim_hz
+
+        lives_timeline = [(0, self.lives)]
+        phases = []
+        phase_start = (0, 0.0, 0, 0, 0)
+        max_blocks = self.blocks.count
+        tick = 0
+        result = None
+
+        while result is None and (max_ticks is None or tick < max_ticks):
+            input_x, input_y = input_source(self, tick)
+            lives = self.lives
+            level_flipped = self.level_flipped
+            result = self.step(input_x, input_y, dt_factor)
+            tick += 1
+            max_blocks = max(max_blocks, self.blocks.count)
+
+            if self.lives != lives:
+                lives_timeline.append((tick, self.lives))
+            # elke portaal-overgang start een nieuwe fase
+            if self.level_flipped != level_flipped or result is not None or tick == max_ticks:
+                start_tick, start_score, start_hits, start_saves, start_powerups = phase_start
+                phases.append({
+                    "mode": "up" if level_flipped else "down",
+                    "start_tick": start_tick,
+                    "ticks": tick - start_tick,
+                    "score": int((self.score - start_score) // 10),
+                    "hits": self.hits_taken - start_hits,
+                    "shield_saves": self.shield_saves - start_saves,
+                    "powerups": self.powerups_collected - start_powerups,
+                    "max_blocks": max_blocks,
+                })
+                phase_start = (tick, self.score, self.hits_taken, self.shield_saves, self.powerups_collected)
+                max_blocks = self.blocks.count
 
-            x = max(self.player_radius, min(SCREEN_WIDTH - self.player_radius, x))
-            y = max(self.player_radius, min(SCREEN_HEIGHT - self.player_radius, y))
+        return {
+            "result": "GAMEOVER" if result == GameState.GAMEOVER else "TIMEOUT",
+            "ticks": tick,
+            "seconds": tick / self.sim_hz,
+            "base_score": int(self.score // 10),
+            "bonus": self.bonus_collected,
+            "score": int(self.score // 10) + self.bonus_collected,
+            "lives": self.lives,
+            "lives_timeline": lives_timeline,
+            "phases": phases,
+        }
 
-            player_rect = pygame.Rect(int(x) - self.player_radius, int(y) - self.player_radius, self.player_radius * 2, self.player_radius * 2)
+    def save_replay(self, path="replays/last.sdr"):
+        if self.replay is None or not len(self.replay):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.replay.save(path)
+        except OSError:
+            pass
 
-            if random.random() < self.powerup_spawn_chance and not portal_active:
-                rand = random.random()
-                if rand > 0.8: pu_type = "BONUS"
-                elif rand > 0.2: pu_type = "SHIELD"
-                else: pu_type = "LIFE"
-                
-                if level_flipped:
-                    start_y = SCREEN_HEIGHT + 50
-                else:
-                    start_y = -50
-                    
-                self.powerups.append({"x": random.randint(50, SCREEN_WIDTH-50), "y": start_y, "type": pu_type, "size": int(40*MIN_SCALE)})
-
-            for pu in self.powerups[:]:
-                pu["y"] += fall_speed * dt_factor
-                pu_r = pygame.Rect(pu["x"], pu["y"], pu["size"], pu["size"])
-                if player_rect.colliderect(pu_r):
-                    if pu["type"] == "BONUS":
-                        self.bonus_collected += 50
-                        if audio.sfx_enabled: audio.play_sfx(audio_path.heal_sound, 0.5)
-                    if pu["type"] == "SHIELD": 
-                        self.shield_active = True
-                        self.shield_timer = 300 
-                    else: 
-                        lives = min(lives + 1, 4)
-                    
-                    if audio.sfx_enabled: audio.play_sfx(audio_path.heal_sound, 0.6)
-                    self.powerups.remove(pu)
-                elif pu["y"] > SCREEN_HEIGHT + 100 or pu["y"] < -200:
-                    self.powerups.remove(pu)
-
-            portal_rect = None
-            p_w = max(1, int(200 * MIN_SCALE))
-            p_h = max(1, int(40 * MIN_SCALE))
-
-            if portal_active:
-                if not level_flipped:
-                    portal_rect = pygame.Rect(int(CENTER_X - (p_w // 2)), int(20 * MIN_SCALE), p_w, p_h)
-                else:
-                    portal_rect = pygame.Rect(int(CENTER_X - (p_w // 2)), SCREEN_HEIGHT - int(40 * MIN_SCALE), p_w, p_h)
+    def run(self, screen) -> GameState:
+        audio.play_music(audio_path.gameplay_music, 0.4)
+        self.load_assets()
 
-            if portal_rect:
-                dx, dy = portal_rect.centerx - x, portal_rect.centery - y
-                x += dx * 0.05 * dt_factor
-                y += dy * 0.05 * dt_factor
-                player_rect.center = (int(x), int(y))
+        c = self.game.controls
+        clock = pygame.time.Clock()
 
-                if player_rect.colliderect(portal_rect):
-                    level_flipped = not level_flipped 
-                    next_portal_score += 250         
+        self.reset_state()
+        step_dt = 1.0 / self.sim_hz
+        dt_factor = step_dt * 60
+        accumulator = 0.0
 
-                    if level_flipped:
-                        x, y = CENTER_X, int(100 * MIN_SCALE)
-                        blocks = self.create_blocks("up")
-                    else:
-                        x, y = CENTER_X, SCREEN_HEIGHT - int(100 * MIN_SCALE)
-                        blocks = self.create_blocks("down")
-                    
-                    player_vx, player_vy = 0.0, 0.0
-                    continue
-
-            for block in blocks:
-                planet_radius = block["size"] / 2
-                hitbox_radius = planet_radius - (6 * MIN_SCALE) 
+        while True:
+            dt = clock.tick(self.render_fps) / 1000.0
+
+            # na een lange hapering niet eindeloos blijven inhalen
+            accumulator += min(dt, 0.25)
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return GameState.QUIT
                 
-                planet_center_x = block["x"] + planet_radius
-                planet_center_y = block["y"] + planet_radius
-
-                distance = math.hypot(x - planet_center_x, y - planet_center_y)
-
-                if distance < (self.player_radius + hitbox_radius) and immunity_timer <= 0 and not portal_active:
-                    if self.shield_active:
-                        self.shield_active = False
-                        self.shield_timer = 0
-                        immunity_timer = 60
-                        if audio.sfx_enabled:
-                            audio.play_sfx(audio_path.hit_sound, 0.3)
-                    else:
-                        lives -= 1
-                        self.shake_intensity = 15
-                        if lives > 0:
-                            audio.play_sfx(audio_path.hit_sound, 0.5)
-                            immunity_timer = 90 
-                        else:
-                            self.game.last_base_score = score // 10
-                            self.game.last_bonus = self.bonus_collected
-                            self.game.last_score = (score // 10) + self.bonus_collected
-                            pygame.mouse.set_visible(True)
-                            return GameState.GAMEOVER
-                    break
-
-            self.render_frame(screen, blocks, x, y, score, lives, immunity_timer, portal_rect, portal_active, player_vx, level_flipped)
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        self.save_replay()
+                        return GameState.TITLE
+
+            keys = pygame.key.get_pressed()
+            input_x = 0
+            input_y = 0
+
+            if keys[c.left]:
+                input_x -= 1
+            if keys[c.right]:
+                input_x += 1
+            if keys[c.up]:
+                input_y -= 1
+            if keys[c.down]:
+                input_y += 1
+
+            while accumulator >= step_dt:
+                accumulator -= step_dt
+                result = self.step(input_x, input_y, dt_factor)
+                if result == GameState.GAMEOVER:
+                    self.save_replay()
+                    pygame.mouse.set_visible(True)
+                    return result
+
+            self.render_frame(screen, accumulator / step_dt)
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False):
         pygame.init()
         pygame.mixer.init()
+        # headless (simulate.py, batch.py): geen geluid decoderen en geen menu's of achtergrondloads
+        if not headless:
+            audio.preload_sfx()
+            audio.preload_music()
 
+        self.assets = assets.AssetManager()
         self.controls = Controls()
         self.last_base_score = 0
         self.last_bonus = 0
         self.last_score = 0
         self.menu_background = None
         self.current_skin = "spaceshipp.png"
+        self.parallax_enabled = True
+        self.dirty_rendering = False
 
-        self.screen = pygame.display.set_mode((REF_WIDTH, REF_HEIGHT), pygame.RESIZABLE)
-        recalc_display_metrics(self.screen)
+        # altijd op 1024x768 tekenen, SDL schaalt bij het tonen naar de venstergrootte
+        if headless:
+            self.screen = pygame.display.set_mode((REF_WIDTH, REF_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((REF_WIDTH, REF_HEIGHT), pygame.SCALED | pygame.RESIZABLE)
 
         global FONT_SCORE
-        FONT_SCORE = pygame.font.SysFont("Arial", max(1, int(30 * MIN_SCALE)), bold=True)
+        FONT_SCORE = fonts.font("Arial", max(1, int(30 * MIN_SCALE)), bold=True)
+        if headless:
+            return
 
         pygame.display.set_caption("Space Dodger")
 
+        # het menu is meteen bruikbaar, de gameplay-afbeeldingen decoderen ondertussen op de achtergrond
+        self.assets.preload(["images/background.png"] + gameplay_image_paths(self.current_skin)
+                            + [f"images/{skin}" for skin in SKINS])
         self._load_menu_background()
 
         self.title_screen = TitleScreen(self)
@@ -1118,12 +1433,13 @@ class Game:
         self.sound_screen = SoundScreen(self)
         self.game_over_screen = GameOverScreen(self)
         self.video_screen = VideoScreen(self)
+        self.loading_screen = LoadingScreen(self)
+        self.menu_scheduler = MenuScheduler()
 
 
     def _load_menu_background(self):
         try:
-            self.menu_background = pygame.image.load("images/background.png").convert()
-            self.menu_background = pygame.transform.scale(self.menu_background, SCREEN_SIZE)
+            self.menu_background = self.assets.image("images/background.png", SCREEN_SIZE, alpha=False)
         except:
             self.menu_background = None
 
@@ -1135,43 +1451,32 @@ class Game:
 
     def game_loop(self, screen, buttons: RenderUpdates) -> GameState:
         screen = self.screen
-        self._load_menu_background()
-        for btn in buttons:
-            if hasattr(btn, "refresh_scaling"):
-                btn.refresh_scaling()
+        scheduler = self.menu_scheduler
+        scheduler.start()
 
         while True:
-            if not pygame.mixer.music.get_busy():
+            if not audio.music_busy():
                 audio.play_music(audio_path.menu_music, 0.5)
 
             mouse_up = False
-            for event in pygame.event.get():
+            for event in scheduler.wait():
                 if event.type == pygame.QUIT:
                     return GameState.QUIT
-                if event.type == pygame.VIDEORESIZE:
-                    self.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
-                    screen = self.screen
-                    recalc_display_metrics(self.screen)
-                    self._load_menu_background()
-                    for btn in buttons:
-                        if hasattr(btn, "refresh_scaling"):
-                            btn.refresh_scaling()
-
 
                 if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
                     mouse_up = True
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                     return GameState.QUIT
 
-            self.draw_menu_background(screen)
-
             for button in buttons:
                 ui_action = button.update(pygame.mouse.get_pos(), mouse_up)
                 if ui_action is not None:
                     return ui_action
-                button.draw(screen)
 
-            pygame.display.flip()
+            if scheduler.changed(buttons):
+                self.draw_menu_background(screen)
+                buttons.draw(screen)
+                scheduler.present()
 
     def run(self):
         game_state = GameState.TITLE
@@ -1181,7 +1486,9 @@ class Game:
                 audio.play_music(audio_path.menu_music, 0.5)
                 game_state = self.title_screen.run(self.screen)
             elif game_state == GameState.PLAYING:
-                game_state = LevelSession(self).run(self.screen)
+                game_state = self.loading_screen.run(self.screen, gameplay_image_paths(self.current_skin, self.parallax_enabled))
+                if game_state == GameState.PLAYING:
+                    game_state = LevelSession(self).run(self.screen)
             elif game_state == GameState.GAMEOVER:
                 self._load_menu_background()
                 audio.play_music(audio_path.gameover_music, 0.5, loop=0)
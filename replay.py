@@ -0,0 +1,93 @@
+import json
+import struct
+
+MAGIC = b"SDRP"
+VERSION = 1
+
+LEFT = 1
+RIGHT = 2
+UP = 4
+DOWN = 8
+
+
+def encode_input(input_x, input_y):
+    bits = 0
+    if input_x < 0: bits |= LEFT
+    if input_x > 0: bits |= RIGHT
+    if input_y < 0: bits |= UP
+    if input_y > 0: bits |= DOWN
+    return bits
+
+
+def decode_input(bits):
+    input_x = (1 if bits & RIGHT else 0) - (1 if bits & LEFT else 0)
+    input_y = (1 if bits & DOWN else 0) - (1 if bits & UP else 0)
+    return input_x, input_y
+
+
+class Replay:
+    def __init__(self, seed, sim_hz, screen_size, skin, inputs=None):
+        self.seed = seed
+        self.sim_hz = sim_hz
+        self.screen_size = tuple(screen_size)
+        self.skin = skin
+        # een byte per tick, bij het opslaan run-length gecodeerd
+        self.inputs = bytearray(inputs or b"")
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, input_x, input_y):
+        self.inputs.append(encode_input(input_x, input_y))
+
+    def input_source(self):
+        inputs = self.inputs
+
+        def source(session, tick):
+            if tick < len(inputs):
+                return decode_input(inputs[tick])
+            return 0, 0
+        return source
+
+    def save(self, path):
+        header = json.dumps({
+            "seed": self.seed,
+            "sim_hz": self.sim_hz,
+            "screen": list(self.screen_size),
+            "skin": self.skin,
+            "ticks": len(self.inputs),
+        }).encode("utf-8")
+
+        runs = bytearray()
+        i = 0
+        while i < len(self.inputs):
+            bits = self.inputs[i]
+            length = 1
+            while i + length < len(self.inputs) and self.inputs[i + length] == bits and length < 0xFFFF:
+                length += 1
+            runs += struct.pack("<HB", length, bits)
+            i += length
+
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<BI", VERSION, len(header)))
+            f.write(header)
+            f.write(runs)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:4] != MAGIC:
+            raise ValueError(f"{path} is geen replay bestand")
+        version, header_len = struct.unpack_from("<BI", data, 4)
+        if version != VERSION:
+            raise ValueError(f"replay versie {version} wordt niet ondersteund")
+        offset = 4 + struct.calcsize("<BI")
+        header = json.loads(data[offset:offset + header_len].decode("utf-8"))
+        offset += header_len
+
+        inputs = bytearray()
+        for length, bits in struct.iter_unpack("<HB", data[offset:]):
+            inputs += bytes([bits]) * length
+        return Replay(header["seed"], header["sim_hz"], header["screen"], header["skin"], inputs)
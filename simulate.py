@@ -0,0 +1,148 @@
+import os
+
+# headless: geen venster en geen geluidskaart nodig
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# stdout is voor de resultaten, --json moet parsebaar blijven
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import random
+import time
+import numpy as np
+import audio
+import main
+import replay
+
+
+def idle_bot(session, tick):
+    return 0, 0
+
+
+class RandomBot:
+    def __init__(self, seed=None, hold_ticks=30):
+        self.random = random.Random(seed)
+        self.hold_ticks = hold_ticks
+        self.current = (0, 0)
+
+    def __call__(self, session, tick):
+        if tick % self.hold_ticks == 0:
+            self.current = (self.random.choice((-1, 0, 1)), self.random.choice((-1, 0, 1)))
+        return self.current
+
+
+def dodge_bot(session, tick):
+    blocks = session.blocks
+    n = blocks.count
+    half = blocks.size[:n] / 2
+    cx = blocks.x[:n] + half
+    cy = blocks.y[:n] + half
+
+    # alleen planeten die nog op de speler afkomen
+    if session.level_flipped:
+        ahead = cy - session.y
+    else:
+        ahead = session.y - cy
+    danger = (ahead > -half) & (ahead < 250 * main.MIN_SCALE) & (np.abs(cx - session.x) < half + session.player_radius * 3)
+
+    if not danger.any():
+        if session.x < main.CENTER_X - 100 * main.MIN_SCALE:
+            return 1, 0
+        if session.x > main.CENTER_X + 100 * main.MIN_SCALE:
+            return -1, 0
+        return 0, 0
+
+    nearest = int(np.argmin(np.where(danger, ahead, np.inf)))
+    input_x = -1 if cx[nearest] > session.x else 1
+    margin = session.player_radius * 2
+    if input_x < 0 and session.x < margin:
+        input_x = 1
+    elif input_x > 0 and session.x > main.SCREEN_WIDTH - margin:
+        input_x = -1
+    return input_x, 0
+
+
+BOTS = {
+    "idle": lambda seed: idle_bot,
+    "random": lambda seed: RandomBot(seed),
+    "dodge": lambda seed: dodge_bot,
+}
+
+_game = None
+
+
+def get_game():
+    global _game
+    if _game is None:
+        audio.music_enabled = False
+        audio.sfx_enabled = False
+        _game = main.Game(headless=True)
+    return _game
+
+
+def run_session(bot="dodge", max_ticks=None, seed=None, record=None, params=None):
+    session = main.LevelSession(get_game(), seed)
+    for name, value in (params or {}).items():
+        setattr(session, name, value)
+    result = session.simulate(BOTS[bot](seed), max_ticks)
+    if record:
+        session.replay.save(record)
+    return result
+
+
+def play_replay(path, max_ticks=None):
+    rep = replay.Replay.load(path)
+    game = get_game()
+    game.current_skin = rep.skin
+    # de simulatie draait altijd op 1024x768, oudere opnames op een andere grootte kloppen niet meer
+    if rep.screen_size != main.SCREEN_SIZE:
+        raise ValueError(f"{path} is opgenomen op {rep.screen_size[0]}x{rep.screen_size[1]}, niet op {main.SCREEN_WIDTH}x{main.SCREEN_HEIGHT}")
+
+    session = main.LevelSession(game, rep.seed)
+    session.sim_hz = rep.sim_hz
+    if max_ticks is None:
+        max_ticks = len(rep)
+    return session.simulate(rep.input_source(), max_ticks)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Speel LevelSession zonder venster zo snel als de CPU toelaat.")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="dodge")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--max-seconds", type=float, default=None, help="gesimuleerde seconden per run")
+    parser.add_argument("--json", action="store_true", help="volledige resultaten als JSON tonen")
+    parser.add_argument("--seed", type=int, default=0, help="seed van de eerste run, volgende runs tellen op")
+    parser.add_argument("--record", metavar="PAD", help="replay van de laatste run opslaan")
+    parser.add_argument("--replay", metavar="PAD", help="een opgenomen replay afspelen in plaats van een bot")
+    args = parser.parse_args()
+
+    max_ticks = None
+    if args.max_seconds is not None:
+        max_ticks = int(args.max_seconds * main.SIM_HZ)
+
+    if args.replay:
+        result = play_replay(args.replay, max_ticks)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"replay: {result['result']} score={result['score']} survived={result['seconds']:.1f}s")
+        return
+
+    results = []
+    for i in range(args.runs):
+        start = time.perf_counter()
+        record = args.record if i == args.runs - 1 else None
+        result = run_session(args.bot, max_ticks, seed=args.seed + i, record=record)
+        wall = time.perf_counter() - start
+        results.append(result)
+        if not args.json:
+            print(f"run {i}: {result['result']} score={result['score']} "
+                  f"survived={result['seconds']:.1f}s phases={len(result['phases'])} wall={wall:.2f}s")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,42 @@
+import math
+import pygame
+
+
+class RotationAtlas:
+    def __init__(self, image, max_angle, step=1.0):
+        self.step = step
+        self.steps = max(0, math.ceil(max_angle / step))
+        self.frames = []
+        self.offsets = []
+        for i in range(-self.steps, self.steps + 1):
+            frame = pygame.transform.rotozoom(image, i * step, 1.0)
+            self.frames.append(frame)
+            self.offsets.append((frame.get_width() // 2, frame.get_height() // 2))
+
+    def index(self, angle):
+        i = int(round(angle / self.step))
+        return max(-self.steps, min(self.steps, i)) + self.steps
+
+    def draw(self, surface, angle, center):
+        i = self.index(angle)
+        offset_x, offset_y = self.offsets[i]
+        return surface.blit(self.frames[i], (center[0] - offset_x, center[1] - offset_y))
+
+
+class RingCache:
+    def __init__(self, color, width):
+        self.color = color
+        self.width = width
+        self.rings = {}
+
+    def get(self, radius):
+        ring = self.rings.get(radius)
+        if ring is None:
+            # zelfde pixels als pygame.draw.circle rond (radius, radius)
+            ring = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+            pygame.draw.circle(ring, self.color, (radius, radius), radius, self.width)
+            self.rings[radius] = ring
+        return ring
+
+    def draw(self, surface, center, radius):
+        return surface.blit(self.get(radius), (center[0] - radius, center[1] - radius))